@@ -3,29 +3,51 @@
 Tool to pack a directory into a .docx, .pptx, or .xlsx file with XML formatting undone.
 
 Example usage:
-    python pack.py <input_directory> <office_file> [--force]
+    python pack.py <input_directory> <office_file> [--force] [--jobs N]
 """
 
 import argparse
-import shutil
 import subprocess
 import sys
 import tempfile
-import defusedxml.minidom
 import zipfile
 from pathlib import Path
 
+from validation.base import STATE_FILE_NAME
+from xml_format import condense_part, map_parts
+
+# The soffice converter is shared with the pptx skill's thumbnail.py.
+_PPTX_SCRIPTS = Path(__file__).resolve().parents[2] / "scripts"
+if str(_PPTX_SCRIPTS) not in sys.path:
+    sys.path.append(str(_PPTX_SCRIPTS))
+from soffice_converter import convert
+
+# Media that is already compressed; deflating it again costs time for no gain
+STORED_EXTENSIONS = {
+    ".png", ".jpg", ".jpeg", ".gif", ".webp", ".wdp",
+    ".mp4", ".m4v", ".mov", ".mp3", ".m4a",
+}
+
 
 def main():
     parser = argparse.ArgumentParser(description="Pack a directory into an Office file")
     parser.add_argument("input_directory", help="Unpacked Office document directory")
     parser.add_argument("output_file", help="Output Office file (.docx/.pptx/.xlsx)")
     parser.add_argument("--force", action="store_true", help="Skip validation")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Condense XML parts in N worker processes (default: 1)",
+    )
     args = parser.parse_args()
 
     try:
         success = pack_document(
-            args.input_directory, args.output_file, validate=not args.force
+            args.input_directory,
+            args.output_file,
+            validate=not args.force,
+            jobs=args.jobs,
         )
 
         # Show warning if validation was skipped
@@ -42,13 +64,15 @@ def main():
         sys.exit(f"Error: {e}")
 
 
-def pack_document(input_dir, output_file, validate=False):
+def pack_document(input_dir, output_file, validate=False, jobs=1):
     """Pack a directory into an Office file (.docx/.pptx/.xlsx).
 
     Args:
         input_dir: Path to unpacked Office document directory
         output_file: Path to output Office file
         validate: If True, validates with soffice (default: False)
+        jobs: Worker processes condensing XML parts (default: 1); the zip is
+            written in the same order either way
 
     Returns:
         bool: True if successful, False if validation failed
@@ -61,32 +85,43 @@ def pack_document(input_dir, output_file, validate=False):
     if output_file.suffix.lower() not in {".docx", ".pptx", ".xlsx"}:
         raise ValueError(f"{output_file} must be a .docx, .pptx, or .xlsx file")
 
-    # Work in temporary directory to avoid modifying original
-    with tempfile.TemporaryDirectory() as temp_dir:
-        temp_content_dir = Path(temp_dir) / "content"
-        shutil.copytree(input_dir, temp_content_dir)
-
-        # Process XML files to remove pretty-printing whitespace
-        for pattern in ["*.xml", "*.rels"]:
-            for xml_file in temp_content_dir.rglob(pattern):
-                condense_xml(xml_file)
-
-        # Create final Office file as zip archive
-        output_file.parent.mkdir(parents=True, exist_ok=True)
-        with zipfile.ZipFile(output_file, "w", zipfile.ZIP_DEFLATED) as zf:
-            for f in temp_content_dir.rglob("*"):
-                if f.is_file():
-                    zf.write(f, f.relative_to(temp_content_dir))
-
-        # Validate if requested
-        if validate:
-            if not validate_document(output_file):
-                output_file.unlink()  # Delete the corrupt file
-                return False
+    # Stream each part from the input directory (left untouched) into the zip,
+    # condensing XML in memory
+    files = _package_files(input_dir)
+    xml_files = [f for f in files if f.name.endswith((".xml", ".rels"))]
+    condensed = map_parts(_condense_file, xml_files, jobs=jobs)
+
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    with zipfile.ZipFile(output_file, "w", zipfile.ZIP_DEFLATED) as zf:
+        for f in files:
+            arcname = f.relative_to(input_dir).as_posix()
+            if f.name.endswith((".xml", ".rels")):
+                zinfo = zipfile.ZipInfo.from_file(f, arcname)
+                zinfo.compress_type = zipfile.ZIP_DEFLATED
+                zf.writestr(zinfo, next(condensed))
+            elif f.suffix.lower() in STORED_EXTENSIONS:
+                zf.write(f, arcname, compress_type=zipfile.ZIP_STORED)
+            else:
+                zf.write(f, arcname)
+
+    # Validate if requested
+    if validate:
+        if not validate_document(output_file):
+            output_file.unlink()  # Delete the corrupt file
+            return False
 
     return True
 
 
+def _package_files(input_dir):
+    """Files to pack, [Content_Types].xml first and the rest sorted by path."""
+    files = [
+        f for f in input_dir.rglob("*") if f.is_file() and f.name != STATE_FILE_NAME
+    ]
+    content_types = input_dir / "[Content_Types].xml"
+    return sorted(files, key=lambda f: (f != content_types, f.as_posix()))
+
+
 def validate_document(doc_path):
     """Validate document by converting to HTML with soffice."""
     # Determine the correct filter based on file extension
@@ -100,24 +135,7 @@ def validate_document(doc_path):
 
     with tempfile.TemporaryDirectory() as temp_dir:
         try:
-            result = subprocess.run(
-                [
-                    "soffice",
-                    "--headless",
-                    "--convert-to",
-                    filter_name,
-                    "--outdir",
-                    temp_dir,
-                    str(doc_path),
-                ],
-                capture_output=True,
-                timeout=10,
-                text=True,
-            )
-            if not (Path(temp_dir) / f"{doc_path.stem}.html").exists():
-                error_msg = result.stderr.strip() or "Document validation failed"
-                print(f"Validation error: {error_msg}", file=sys.stderr)
-                return False
+            convert(doc_path, temp_dir, filter_name, timeout=10)
             return True
         except FileNotFoundError:
             print("Warning: soffice not found. Skipping validation.", file=sys.stderr)
@@ -130,29 +148,14 @@ def validate_document(doc_path):
             return False
 
 
+def _condense_file(xml_file):
+    return condense_part(xml_file.read_bytes())
+
+
 def condense_xml(xml_file):
     """Strip unnecessary whitespace and remove comments."""
-    with open(xml_file, "r", encoding="utf-8") as f:
-        dom = defusedxml.minidom.parse(f)
-
-    # Process each element to remove whitespace and comments
-    for element in dom.getElementsByTagName("*"):
-        # Skip w:t elements and their processing
-        if element.tagName.endswith(":t"):
-            continue
-
-        # Remove whitespace-only text nodes and comment nodes
-        for child in list(element.childNodes):
-            if (
-                child.nodeType == child.TEXT_NODE
-                and child.nodeValue
-                and child.nodeValue.strip() == ""
-            ) or child.nodeType == child.COMMENT_NODE:
-                element.removeChild(child)
-
-    # Write back the condensed XML
-    with open(xml_file, "wb") as f:
-        f.write(dom.toxml(encoding="UTF-8"))
+    xml_file = Path(xml_file)
+    xml_file.write_bytes(condense_part(xml_file.read_bytes()))
 
 
 if __name__ == "__main__":
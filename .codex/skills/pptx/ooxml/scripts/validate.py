@@ -3,11 +3,15 @@
 Command line tool to validate Office document XML files against XSD schemas and tracked changes.
 
 Usage:
-    python validate.py <dir> --original <original_file>
+    python validate.py <dir> --original <original_file> [--jobs N] [--incremental]
+    python validate.py <packed_file> --original <original_file> [--jobs N]
+
+A packed .docx/.pptx/.xlsx is validated by reading its parts straight from the zip.
 """
 
 import argparse
 import sys
+import zipfile
 from pathlib import Path
 
 from validation import DOCXSchemaValidator, PPTXSchemaValidator, RedliningValidator
@@ -17,7 +21,7 @@ def main():
     parser = argparse.ArgumentParser(description="Validate Office document XML files")
     parser.add_argument(
         "unpacked_dir",
-        help="Path to unpacked Office document directory",
+        help="Path to unpacked Office document directory, or to a packed .docx/.pptx/.xlsx",
     )
     parser.add_argument(
         "--original",
@@ -30,13 +34,29 @@ def main():
         action="store_true",
         help="Enable verbose output",
     )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Validate parts against the XSD schemas in N worker processes (default: 1)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only re-check parts changed since the last --incremental run "
+        "(results are kept in <dir>/.validation-state.json, which pack.py skips)",
+    )
     args = parser.parse_args()
 
     # Validate paths
     unpacked_dir = Path(args.unpacked_dir)
     original_file = Path(args.original)
     file_extension = original_file.suffix.lower()
-    assert unpacked_dir.is_dir(), f"Error: {unpacked_dir} is not a directory"
+    assert unpacked_dir.is_dir() or zipfile.is_zipfile(unpacked_dir), (
+        f"Error: {unpacked_dir} is not a directory or a packed Office file"
+    )
+    if args.incremental and not unpacked_dir.is_dir():
+        parser.error("--incremental needs an unpacked directory")
     assert original_file.is_file(), f"Error: {original_file} is not a file"
     assert file_extension in [".docx", ".pptx", ".xlsx"], (
         f"Error: {original_file} must be a .docx, .pptx, or .xlsx file"
@@ -55,9 +75,20 @@ def main():
     # Run validators
     success = True
     for V in validators:
-        validator = V(unpacked_dir, original_file, verbose=args.verbose)
+        if V is RedliningValidator:
+            validator = V(unpacked_dir, original_file, verbose=args.verbose)
+        else:
+            validator = V(
+                unpacked_dir,
+                original_file,
+                verbose=args.verbose,
+                jobs=args.jobs,
+                incremental=args.incremental,
+            )
         if not validator.validate():
             success = False
+        if args.incremental and V is not RedliningValidator:
+            validator.save_state()
 
     if success:
         print("All validations PASSED!")
@@ -0,0 +1,12 @@
+from .docx import DOCXSchemaValidator
+from .package_graph import PackageGraph, Relationship
+from .pptx import PPTXSchemaValidator
+from .redlining import RedliningValidator
+
+__all__ = [
+    "DOCXSchemaValidator",
+    "PackageGraph",
+    "PPTXSchemaValidator",
+    "RedliningValidator",
+    "Relationship",
+]
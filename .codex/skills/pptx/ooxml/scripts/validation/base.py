@@ -2,39 +2,140 @@
 Base validator with common validation logic for document files.
 """
 
+import copy
+import hashlib
+import json
+import os
 import re
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 import lxml.etree
 
+from .package_graph import PackageGraph
+
+# Per-part check results kept in the unpacked dir by incremental runs (never packed)
+STATE_FILE_NAME = ".validation-state.json"
+# Bump when a per-part check changes what it records, so older state files are ignored
+STATE_VERSION = 2
+
+# Compiled XSD schemas by schema path, shared by every validator in the process.
+# Compiling the PresentationML/WordprocessingML schemas (with their imports) costs
+# far more than validating a single part against them. A schema that failed to
+# compile is cached as its exception, so it is not recompiled for every part.
+_SCHEMA_CACHE = {}
+
+
+def _load_schema(schema_path):
+    """Return the compiled schema for `schema_path` and the seconds spent compiling it (0.0 if cached).
+
+    If the schema does not compile, the first element is the exception instead.
+    """
+    schema_path = Path(schema_path)
+    schema = _SCHEMA_CACHE.get(schema_path)
+    if schema is not None:
+        return schema, 0.0
+
+    start = time.perf_counter()
+    try:
+        with open(schema_path, "rb") as xsd_file:
+            parser = lxml.etree.XMLParser()
+            xsd_doc = lxml.etree.parse(xsd_file, parser=parser, base_url=str(schema_path))
+            schema = lxml.etree.XMLSchema(xsd_doc)
+    except Exception as e:
+        schema = e
+    _SCHEMA_CACHE[schema_path] = schema
+    return schema, time.perf_counter() - start
+
+
+class _DirectoryPackage:
+    """Files of an unpacked package directory."""
+
+    def __init__(self, root):
+        self.root = root
+
+    def names(self):
+        return sorted(
+            f.relative_to(self.root).as_posix()
+            for f in self.root.rglob("*")
+            if f.is_file() and f.name != STATE_FILE_NAME
+        )
+
+    def open(self, name):
+        return open(self.root / name, "rb")
+
+    def parse(self, name):
+        return lxml.etree.parse(str(self.root / name))
+
+
+class _ZipPackage:
+    """Files of a packed .docx/.pptx/.xlsx, read from the archive without extracting it."""
+
+    def __init__(self, path):
+        self._zip = zipfile.ZipFile(path, "r")
+
+    def names(self):
+        return sorted(n for n in self._zip.namelist() if not n.endswith("/"))
+
+    def open(self, name):
+        return self._zip.open(name)
+
+    def parse(self, name):
+        with self._zip.open(name) as f:
+            return lxml.etree.parse(f)
+
+
+# Validator owned by an XSD worker process (see BaseSchemaValidator._xsd_results)
+_worker_validator = None
+
+
+def _init_xsd_worker(validator_cls, unpacked_dir, original_file):
+    global _worker_validator
+    _worker_validator = validator_cls(unpacked_dir, original_file)
+
+
+def _validate_xsd_shard(shard):
+    """Validate `(index, xml_file)` pairs in a worker. Returns (indexed results, schema timings)."""
+    validator = _worker_validator
+    validator.schema_timings = {}
+    results = [
+        (i, validator.validate_file_against_xsd(xml_file, verbose=False))
+        for i, xml_file in shard
+    ]
+    validator._close_original()
+    return results, validator.schema_timings
+
 
 class BaseSchemaValidator:
     """Base validator with common validation logic for document files."""
 
     # Elements whose 'id' attributes must be unique within their file
-    # Format: element_name -> (attribute_name, scope)
+    # Format: element_name -> (attribute_name, scope), spelled as in the schemas
+    # (element names match in any namespace; attributes unqualified or in the element's namespace)
     # scope can be 'file' (unique within file) or 'global' (unique across all files)
     UNIQUE_ID_REQUIREMENTS = {
         # Word elements
         "comment": ("id", "file"),  # Comment IDs in comments.xml
-        "commentrangestart": ("id", "file"),  # Must match comment IDs
-        "commentrangeend": ("id", "file"),  # Must match comment IDs
-        "bookmarkstart": ("id", "file"),  # Bookmark start IDs
-        "bookmarkend": ("id", "file"),  # Bookmark end IDs
+        "commentRangeStart": ("id", "file"),  # Must match comment IDs
+        "commentRangeEnd": ("id", "file"),  # Must match comment IDs
+        "bookmarkStart": ("id", "file"),  # Bookmark start IDs
+        "bookmarkEnd": ("id", "file"),  # Bookmark end IDs
         # Note: ins and del (track changes) can share IDs when part of same revision
         # PowerPoint elements
-        "sldid": ("id", "file"),  # Slide IDs in presentation.xml
-        "sldmasterid": ("id", "global"),  # Slide master IDs must be globally unique
-        "sldlayoutid": ("id", "global"),  # Slide layout IDs must be globally unique
-        "cm": ("authorid", "file"),  # Comment author IDs
+        "sldId": ("id", "file"),  # Slide IDs in presentation.xml
+        "sldMasterId": ("id", "global"),  # Slide master IDs must be globally unique
+        "sldLayoutId": ("id", "global"),  # Slide layout IDs must be globally unique
+        "cm": ("authorId", "file"),  # Comment author IDs
         # Excel elements
-        "sheet": ("sheetid", "file"),  # Sheet IDs in workbook.xml
-        "definedname": ("id", "file"),  # Named range IDs
+        "sheet": ("sheetId", "file"),  # Sheet IDs in workbook.xml
+        "definedName": ("id", "file"),  # Named range IDs
         # Drawing/Shape elements (all formats)
-        "cxnsp": ("id", "file"),  # Connection shape IDs
+        "cxnSp": ("id", "file"),  # Connection shape IDs
         "sp": ("id", "file"),  # Shape IDs
         "pic": ("id", "file"),  # Picture IDs
-        "grpsp": ("id", "file"),  # Group shape IDs
+        "grpSp": ("id", "file"),  # Group shape IDs
     }
 
     # Mapping of element names to expected relationship types
@@ -103,23 +204,163 @@ class BaseSchemaValidator:
         "http://www.w3.org/XML/1998/namespace",
     }
 
-    def __init__(self, unpacked_dir, original_file, verbose=False):
+    def __init__(
+        self, unpacked_dir, original_file, verbose=False, jobs=1, incremental=False
+    ):
+        # An unpacked directory, or a packed file whose parts are read straight from
+        # the zip. Either way parts are addressed as paths below `unpacked_dir`
+        # (for a packed file they are virtual and only used as names).
         self.unpacked_dir = Path(unpacked_dir).resolve()
         self.original_file = Path(original_file)
         self.verbose = verbose
+        self.jobs = max(1, jobs or 1)  # worker processes for XSD validation
+        self.incremental = incremental  # reuse per-part results from STATE_FILE_NAME
+
+        self.packed = self.unpacked_dir.is_file()
+        if self.packed and incremental:
+            raise ValueError("Incremental validation needs an unpacked directory")
+        if self.packed:
+            self._package = _ZipPackage(self.unpacked_dir)
+        else:
+            self._package = _DirectoryPackage(self.unpacked_dir)
+        self.file_names = self._package.names()
 
         # Set schemas directory
         self.schemas_dir = Path(__file__).parent.parent.parent / "schemas"
 
         # Get all XML and .rels files
-        patterns = ["*.xml", "*.rels"]
         self.xml_files = [
-            f for pattern in patterns for f in self.unpacked_dir.rglob(pattern)
+            self.unpacked_dir / name
+            for suffix in (".xml", ".rels")
+            for name in self.file_names
+            if name.endswith(suffix)
         ]
 
         if not self.xml_files:
             print(f"Warning: No XML files found in {self.unpacked_dir}")
 
+        # Parsed trees shared by all checks (path -> ElementTree, or the parse error)
+        self._parsed = {}
+        self._graph = None
+
+        # XSD timings per schema file name:
+        # [compile seconds, validate seconds, parts validated, parts whose schema failed to compile]
+        self.schema_timings = {}
+
+        # Original package, opened on first use; XSD errors of its parts by relative path
+        self._original_zip = None
+        self._original_errors = {}
+
+        # Incremental state: per-part results from the last run, and this run's
+        # (relative path -> {"sha1": content hash, "checks": {check name: result}})
+        self._state_key = None
+        self._stored_parts = self._load_state() if incremental else {}
+        self._part_state = {}
+        self.changed_parts = 0
+
+    def _current_state_key(self):
+        """What a stored state must match to be reused (check version, validator, original)."""
+        if self._state_key is None:
+            digest = hashlib.sha1()
+            with open(self.original_file, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(chunk)
+            self._state_key = [STATE_VERSION, type(self).__name__, digest.hexdigest()]
+        return self._state_key
+
+    def _load_state(self):
+        try:
+            state = json.loads((self.unpacked_dir / STATE_FILE_NAME).read_text())
+        except (OSError, ValueError):
+            return {}
+        if state.get("key") != self._current_state_key():
+            return {}
+        return state.get("parts", {})
+
+    def save_state(self):
+        """Write this run's per-part results for the next incremental run."""
+        if not self.incremental:
+            return
+        state_file = self.unpacked_dir / STATE_FILE_NAME
+        tmp = state_file.with_name(state_file.name + ".tmp")
+        tmp.write_text(
+            json.dumps({"key": self._current_state_key(), "parts": self._part_state})
+        )
+        os.replace(tmp, state_file)
+        if self.verbose:
+            print(
+                f"Incremental: {self.changed_parts} of {len(self._part_state)} "
+                f"part(s) changed since the last run"
+            )
+
+    def _part_checks(self, xml_file):
+        """Stored results for `xml_file`, or a fresh entry if its content changed."""
+        rel = Path(xml_file).relative_to(self.unpacked_dir).as_posix()
+        entry = self._part_state.get(rel)
+        if entry is None:
+            with self._package.open(rel) as f:
+                digest = hashlib.sha1(f.read()).hexdigest()
+            stored = self._stored_parts.get(rel)
+            if stored and stored.get("sha1") == digest:
+                checks = dict(stored.get("checks", {}))
+            else:
+                checks = {}
+                self.changed_parts += 1
+            entry = self._part_state[rel] = {"sha1": digest, "checks": checks}
+        return entry["checks"]
+
+    def _part_result(self, check, xml_file, compute):
+        """`compute(xml_file)`, reused from the last run when the part is unchanged.
+
+        Results must be JSON values (lists, not tuples or sets). Exceptions are
+        not recorded and propagate to the caller as usual.
+        """
+        if not self.incremental:
+            return compute(xml_file)
+        checks = self._part_checks(xml_file)
+        if check not in checks:
+            checks[check] = compute(xml_file)
+        return checks[check]
+
+    def _parse(self, xml_file):
+        """Parse a part of the package once per validator and share the tree.
+
+        The returned tree is shared across checks and must not be modified; use
+        `_parse_copy` in checks that edit the tree. Parse errors are cached and
+        re-raised on every call.
+        """
+        xml_file = Path(xml_file)
+        if self.unpacked_dir not in xml_file.parents:
+            return lxml.etree.parse(str(xml_file))  # outside the package: not cached
+
+        cached = self._parsed.get(xml_file)
+        if cached is None:
+            try:
+                cached = self._package.parse(self._part_name(xml_file))
+            except lxml.etree.XMLSyntaxError as e:
+                cached = e
+            self._parsed[xml_file] = cached
+        if isinstance(cached, Exception):
+            raise cached
+        return cached
+
+    def _parse_copy(self, xml_file):
+        """Private, modifiable copy of `_parse(xml_file)`."""
+        return copy.deepcopy(self._parse(xml_file))
+
+    @property
+    def graph(self):
+        """`PackageGraph` of the package, built on first use from the shared trees."""
+        if self._graph is None:
+            self._graph = PackageGraph(
+                self.unpacked_dir, parse=self._parse, files=self.file_names
+            )
+        return self._graph
+
+    def _part_name(self, xml_file):
+        """Package path of a part, as used by `graph`."""
+        return Path(xml_file).relative_to(self.unpacked_dir).as_posix()
+
     def validate(self):
         """Run all validation checks and return True if all pass."""
         raise NotImplementedError("Subclasses must implement the validate method")
@@ -129,19 +370,7 @@ class BaseSchemaValidator:
         errors = []
 
         for xml_file in self.xml_files:
-            try:
-                # Try to parse the XML file
-                lxml.etree.parse(str(xml_file))
-            except lxml.etree.XMLSyntaxError as e:
-                errors.append(
-                    f"  {xml_file.relative_to(self.unpacked_dir)}: "
-                    f"Line {e.lineno}: {e.msg}"
-                )
-            except Exception as e:
-                errors.append(
-                    f"  {xml_file.relative_to(self.unpacked_dir)}: "
-                    f"Unexpected error: {str(e)}"
-                )
+            errors.extend(self._part_result("xml", xml_file, self._well_formed_errors))
 
         if errors:
             print(f"FAILED - Found {len(errors)} XML violations:")
@@ -153,26 +382,30 @@ class BaseSchemaValidator:
                 print("PASSED - All XML files are well-formed")
             return True
 
+    def _well_formed_errors(self, xml_file):
+        try:
+            # Try to parse the XML file
+            self._parse(xml_file)
+        except lxml.etree.XMLSyntaxError as e:
+            return [
+                f"  {xml_file.relative_to(self.unpacked_dir)}: "
+                f"Line {e.lineno}: {e.msg}"
+            ]
+        except Exception as e:
+            return [
+                f"  {xml_file.relative_to(self.unpacked_dir)}: "
+                f"Unexpected error: {str(e)}"
+            ]
+        return []
+
     def validate_namespaces(self):
         """Validate that namespace prefixes in Ignorable attributes are declared."""
         errors = []
 
         for xml_file in self.xml_files:
-            try:
-                root = lxml.etree.parse(str(xml_file)).getroot()
-                declared = set(root.nsmap.keys()) - {None}  # Exclude default namespace
-
-                for attr_val in [
-                    v for k, v in root.attrib.items() if k.endswith("Ignorable")
-                ]:
-                    undeclared = set(attr_val.split()) - declared
-                    errors.extend(
-                        f"  {xml_file.relative_to(self.unpacked_dir)}: "
-                        f"Namespace '{ns}' in Ignorable but not declared"
-                        for ns in undeclared
-                    )
-            except lxml.etree.XMLSyntaxError:
-                continue
+            errors.extend(
+                self._part_result("namespaces", xml_file, self._namespace_errors)
+            )
 
         if errors:
             print(f"FAILED - {len(errors)} namespace issues:")
@@ -183,86 +416,51 @@ class BaseSchemaValidator:
             print("PASSED - All namespace prefixes properly declared")
         return True
 
+    def _namespace_errors(self, xml_file):
+        errors = []
+        try:
+            root = self._parse(xml_file).getroot()
+            declared = set(root.nsmap.keys()) - {None}  # Exclude default namespace
+
+            for attr_val in [
+                v for k, v in root.attrib.items() if k.endswith("Ignorable")
+            ]:
+                undeclared = set(attr_val.split()) - declared
+                errors.extend(
+                    f"  {xml_file.relative_to(self.unpacked_dir)}: "
+                    f"Namespace '{ns}' in Ignorable but not declared"
+                    for ns in undeclared
+                )
+        except lxml.etree.XMLSyntaxError:
+            pass
+        return errors
+
     def validate_unique_ids(self):
         """Validate that specific IDs are unique according to OOXML requirements."""
         errors = []
         global_ids = {}  # Track globally unique IDs across all files
 
         for xml_file in self.xml_files:
-            try:
-                root = lxml.etree.parse(str(xml_file)).getroot()
-                file_ids = {}  # Track IDs that must be unique within this file
+            # File-scope errors come precomputed; global IDs are checked across files here
+            for entry in self._part_result("unique_ids", xml_file, self._unique_id_entries):
+                if entry[0] == "error":
+                    errors.append(entry[1])
+                    continue
 
-                # Remove all mc:AlternateContent elements from the tree
-                mc_elements = root.xpath(
-                    ".//mc:AlternateContent", namespaces={"mc": self.MC_NAMESPACE}
-                )
-                for elem in mc_elements:
-                    elem.getparent().remove(elem)
-
-                # Now check IDs in the cleaned tree
-                for elem in root.iter():
-                    # Get the element name without namespace
-                    tag = (
-                        elem.tag.split("}")[-1].lower()
-                        if "}" in elem.tag
-                        else elem.tag.lower()
+                _, id_value, line, tag = entry
+                if id_value in global_ids:
+                    prev_file, prev_line, prev_tag = global_ids[id_value]
+                    errors.append(
+                        f"  {xml_file.relative_to(self.unpacked_dir)}: "
+                        f"Line {line}: Global ID '{id_value}' in <{tag}> "
+                        f"already used in {prev_file} at line {prev_line} in <{prev_tag}>"
+                    )
+                else:
+                    global_ids[id_value] = (
+                        xml_file.relative_to(self.unpacked_dir),
+                        line,
+                        tag,
                     )
-
-                    # Check if this element type has ID uniqueness requirements
-                    if tag in self.UNIQUE_ID_REQUIREMENTS:
-                        attr_name, scope = self.UNIQUE_ID_REQUIREMENTS[tag]
-
-                        # Look for the specified attribute
-                        id_value = None
-                        for attr, value in elem.attrib.items():
-                            attr_local = (
-                                attr.split("}")[-1].lower()
-                                if "}" in attr
-                                else attr.lower()
-                            )
-                            if attr_local == attr_name:
-                                id_value = value
-                                break
-
-                        if id_value is not None:
-                            if scope == "global":
-                                # Check global uniqueness
-                                if id_value in global_ids:
-                                    prev_file, prev_line, prev_tag = global_ids[
-                                        id_value
-                                    ]
-                                    errors.append(
-                                        f"  {xml_file.relative_to(self.unpacked_dir)}: "
-                                        f"Line {elem.sourceline}: Global ID '{id_value}' in <{tag}> "
-                                        f"already used in {prev_file} at line {prev_line} in <{prev_tag}>"
-                                    )
-                                else:
-                                    global_ids[id_value] = (
-                                        xml_file.relative_to(self.unpacked_dir),
-                                        elem.sourceline,
-                                        tag,
-                                    )
-                            elif scope == "file":
-                                # Check file-level uniqueness
-                                key = (tag, attr_name)
-                                if key not in file_ids:
-                                    file_ids[key] = {}
-
-                                if id_value in file_ids[key]:
-                                    prev_line = file_ids[key][id_value]
-                                    errors.append(
-                                        f"  {xml_file.relative_to(self.unpacked_dir)}: "
-                                        f"Line {elem.sourceline}: Duplicate {attr_name}='{id_value}' in <{tag}> "
-                                        f"(first occurrence at line {prev_line})"
-                                    )
-                                else:
-                                    file_ids[key][id_value] = elem.sourceline
-
-            except (lxml.etree.XMLSyntaxError, Exception) as e:
-                errors.append(
-                    f"  {xml_file.relative_to(self.unpacked_dir)}: Error: {e}"
-                )
 
         if errors:
             print(f"FAILED - Found {len(errors)} ID uniqueness violations:")
@@ -274,99 +472,120 @@ class BaseSchemaValidator:
                 print("PASSED - All required IDs are unique")
             return True
 
+    def _unique_id_entries(self, xml_file):
+        """IDs of one part in document order: ["error", message] for file-scope
+        violations and ["global", id, line, tag] for IDs that must be unique
+        across the package."""
+        entries = []
+        mc_tag = f"{{{self.MC_NAMESPACE}}}AlternateContent"
+        tags = [mc_tag] + [f"{{*}}{name}" for name in self.UNIQUE_ID_REQUIREMENTS]
+        rules = {}  # element tag -> (reported tag, attribute name, scope, attribute keys)
+        file_ids = {}  # Track IDs that must be unique within this file
+        mc_depth = 0  # Everything inside mc:AlternateContent is ignored
+
+        try:
+            for event, elem in self._iter_elements(xml_file, tags):
+                if elem.tag == mc_tag:
+                    mc_depth += 1 if event == "start" else -1
+                    continue
+                if event != "start" or mc_depth:
+                    continue
+
+                rule = rules.get(elem.tag)
+                if rule is None:
+                    qname = lxml.etree.QName(elem)
+                    attr_name, scope = self.UNIQUE_ID_REQUIREMENTS[qname.localname]
+                    keys = [attr_name]
+                    if qname.namespace:
+                        keys.append(f"{{{qname.namespace}}}{attr_name}")
+                    rule = rules[elem.tag] = (
+                        qname.localname.lower(),
+                        attr_name.lower(),
+                        scope,
+                        keys,
+                    )
+                tag, attr_name, scope, keys = rule
+
+                id_value = None
+                for key in keys:
+                    id_value = elem.get(key)
+                    if id_value is not None:
+                        break
+                if id_value is None:
+                    continue
+
+                if scope == "global":
+                    entries.append(["global", id_value, elem.sourceline, tag])
+                elif scope == "file":
+                    # Check file-level uniqueness
+                    seen = file_ids.setdefault((tag, attr_name), {})
+                    if id_value in seen:
+                        entries.append([
+                            "error",
+                            f"  {xml_file.relative_to(self.unpacked_dir)}: "
+                            f"Line {elem.sourceline}: Duplicate {attr_name}='{id_value}' in <{tag}> "
+                            f"(first occurrence at line {seen[id_value]})",
+                        ])
+                    else:
+                        seen[id_value] = elem.sourceline
+
+        except (lxml.etree.XMLSyntaxError, Exception) as e:
+            entries.append(
+                ["error", f"  {xml_file.relative_to(self.unpacked_dir)}: Error: {e}"]
+            )
+        return entries
+
+    def _iter_elements(self, xml_file, tags):
+        """(event, element) at the start and end of each element matching `tags`.
+
+        Walks the shared tree when the part has already been parsed; otherwise
+        streams the file with iterparse, dropping elements once they have been
+        seen so memory stays bounded on very large parts.
+        """
+        xml_file = Path(xml_file)
+        events = ("start", "end")
+        if xml_file in self._parsed:
+            yield from lxml.etree.iterwalk(self._parse(xml_file), events=events, tag=tags)
+            return
+
+        with self._package.open(self._part_name(xml_file)) as f:
+            for event, elem in lxml.etree.iterparse(f, events=events, tag=tags):
+                yield event, elem
+                if event == "end":
+                    elem.clear(keep_tail=True)
+                    while elem.getprevious() is not None:
+                        del elem.getparent()[0]
+
     def validate_file_references(self):
         """
         Validate that all .rels files properly reference files and that all files are referenced.
         """
         errors = []
+        graph = self.graph
 
-        # Find all .rels files
-        rels_files = list(self.unpacked_dir.rglob("*.rels"))
-
-        if not rels_files:
+        if not graph.rels_files:
             if self.verbose:
                 print("PASSED - No .rels files found")
             return True
 
-        # Get all files in the unpacked directory (excluding reference files)
-        all_files = []
-        for file_path in self.unpacked_dir.rglob("*"):
-            if (
-                file_path.is_file()
-                and file_path.name != "[Content_Types].xml"
-                and not file_path.name.endswith(".rels")
-            ):  # This file is not referenced by .rels
-                all_files.append(file_path.resolve())
-
-        # Track all files that are referenced by any .rels file
-        all_referenced_files = set()
-
         if self.verbose:
             print(
-                f"Found {len(rels_files)} .rels files and {len(all_files)} target files"
+                f"Found {len(graph.rels_files)} .rels files and {len(graph.parts)} target files"
             )
 
-        # Check each .rels file
-        for rels_file in rels_files:
+        # Check each .rels file for targets that do not exist (external URLs are skipped)
+        for rels_file in graph.rels_files:
             try:
-                # Parse relationships file
-                rels_root = lxml.etree.parse(str(rels_file)).getroot()
-
-                # Get the directory where this .rels file is located
-                rels_dir = rels_file.parent
-
-                # Find all relationships and their targets
-                referenced_files = set()
-                broken_refs = []
-
-                for rel in rels_root.findall(
-                    ".//ns:Relationship",
-                    namespaces={"ns": self.PACKAGE_RELATIONSHIPS_NAMESPACE},
-                ):
-                    target = rel.get("Target")
-                    if target and not target.startswith(
-                        ("http", "mailto:")
-                    ):  # Skip external URLs
-                        # Resolve the target path relative to the .rels file location
-                        if rels_file.name == ".rels":
-                            # Root .rels file - targets are relative to unpacked_dir
-                            target_path = self.unpacked_dir / target
-                        else:
-                            # Other .rels files - targets are relative to their parent's parent
-                            # e.g., word/_rels/document.xml.rels -> targets relative to word/
-                            base_dir = rels_dir.parent
-                            target_path = base_dir / target
-
-                        # Normalize the path and check if it exists
-                        try:
-                            target_path = target_path.resolve()
-                            if target_path.exists() and target_path.is_file():
-                                referenced_files.add(target_path)
-                                all_referenced_files.add(target_path)
-                            else:
-                                broken_refs.append((target, rel.sourceline))
-                        except (OSError, ValueError):
-                            broken_refs.append((target, rel.sourceline))
-
-                # Report broken references
-                if broken_refs:
-                    rel_path = rels_file.relative_to(self.unpacked_dir)
-                    for broken_ref, line_num in broken_refs:
-                        errors.append(
-                            f"  {rel_path}: Line {line_num}: Broken reference to {broken_ref}"
-                        )
-
+                for rel in graph.broken_relationships(graph.source_of(rels_file)):
+                    errors.append(
+                        f"  {rels_file}: Line {rel.line}: Broken reference to {rel.target}"
+                    )
             except Exception as e:
-                rel_path = rels_file.relative_to(self.unpacked_dir)
-                errors.append(f"  Error parsing {rel_path}: {e}")
+                errors.append(f"  Error parsing {rels_file}: {e}")
 
         # Check for unreferenced files (files that exist but are not referenced anywhere)
-        unreferenced_files = set(all_files) - all_referenced_files
-
-        if unreferenced_files:
-            for unref_file in sorted(unreferenced_files):
-                unref_rel_path = unref_file.relative_to(self.unpacked_dir)
-                errors.append(f"  Unreferenced file: {unref_rel_path}")
+        for part in graph.unreferenced_parts():
+            errors.append(f"  Unreferenced file: {part}")
 
         if errors:
             print(f"FAILED - Found {len(errors)} relationship validation errors:")
@@ -400,73 +619,52 @@ class BaseSchemaValidator:
             if xml_file.suffix == ".rels":
                 continue
 
-            # Determine the corresponding .rels file
-            # For dir/file.xml, it's dir/_rels/file.xml.rels
-            rels_dir = xml_file.parent / "_rels"
-            rels_file = rels_dir / f"{xml_file.name}.rels"
-
             # Skip if there's no corresponding .rels file (that's okay)
-            if not rels_file.exists():
+            source = self._part_name(xml_file)
+            if not self.graph.has_relationships(source):
                 continue
 
             try:
-                # Parse the .rels file to get valid relationship IDs and their types
-                rels_root = lxml.etree.parse(str(rels_file)).getroot()
+                # Valid relationship IDs and their type names (e.g. "slideLayout")
                 rid_to_type = {}
-
-                for rel in rels_root.findall(
-                    f".//{{{self.PACKAGE_RELATIONSHIPS_NAMESPACE}}}Relationship"
-                ):
-                    rid = rel.get("Id")
-                    rel_type = rel.get("Type", "")
-                    if rid:
+                for rel in self.graph.relationships_from(source):
+                    if rel.id:
                         # Check for duplicate rIds
-                        if rid in rid_to_type:
-                            rels_rel_path = rels_file.relative_to(self.unpacked_dir)
+                        if rel.id in rid_to_type:
                             errors.append(
-                                f"  {rels_rel_path}: Line {rel.sourceline}: "
-                                f"Duplicate relationship ID '{rid}' (IDs must be unique)"
+                                f"  {rel.rels_file}: Line {rel.line}: "
+                                f"Duplicate relationship ID '{rel.id}' (IDs must be unique)"
                             )
-                        # Extract just the type name from the full URL
-                        type_name = (
-                            rel_type.split("/")[-1] if "/" in rel_type else rel_type
+                        rid_to_type[rel.id] = rel.type_name
+
+                # All r:id references in the XML file
+                references = self._part_result(
+                    "rid_references", xml_file, self._rid_references
+                )
+                for elem_name, rid_attr, sourceline in references:
+                    xml_rel_path = xml_file.relative_to(self.unpacked_dir)
+
+                    # Check if the ID exists
+                    if rid_attr not in rid_to_type:
+                        errors.append(
+                            f"  {xml_rel_path}: Line {sourceline}: "
+                            f"<{elem_name}> references non-existent relationship '{rid_attr}' "
+                            f"(valid IDs: {', '.join(sorted(rid_to_type.keys())[:5])}{'...' if len(rid_to_type) > 5 else ''})"
                         )
-                        rid_to_type[rid] = type_name
-
-                # Parse the XML file to find all r:id references
-                xml_root = lxml.etree.parse(str(xml_file)).getroot()
-
-                # Find all elements with r:id attributes
-                for elem in xml_root.iter():
-                    # Check for r:id attribute (relationship ID)
-                    rid_attr = elem.get(f"{{{self.OFFICE_RELATIONSHIPS_NAMESPACE}}}id")
-                    if rid_attr:
-                        xml_rel_path = xml_file.relative_to(self.unpacked_dir)
-                        elem_name = (
-                            elem.tag.split("}")[-1] if "}" in elem.tag else elem.tag
+                    # Check if we have type expectations for this element
+                    elif self.ELEMENT_RELATIONSHIP_TYPES:
+                        expected_type = self._get_expected_relationship_type(
+                            elem_name
                         )
-
-                        # Check if the ID exists
-                        if rid_attr not in rid_to_type:
-                            errors.append(
-                                f"  {xml_rel_path}: Line {elem.sourceline}: "
-                                f"<{elem_name}> references non-existent relationship '{rid_attr}' "
-                                f"(valid IDs: {', '.join(sorted(rid_to_type.keys())[:5])}{'...' if len(rid_to_type) > 5 else ''})"
-                            )
-                        # Check if we have type expectations for this element
-                        elif self.ELEMENT_RELATIONSHIP_TYPES:
-                            expected_type = self._get_expected_relationship_type(
-                                elem_name
-                            )
-                            if expected_type:
-                                actual_type = rid_to_type[rid_attr]
-                                # Check if the actual type matches or contains the expected type
-                                if expected_type not in actual_type.lower():
-                                    errors.append(
-                                        f"  {xml_rel_path}: Line {elem.sourceline}: "
-                                        f"<{elem_name}> references '{rid_attr}' which points to '{actual_type}' "
-                                        f"but should point to a '{expected_type}' relationship"
-                                    )
+                        if expected_type:
+                            actual_type = rid_to_type[rid_attr]
+                            # Check if the actual type matches or contains the expected type
+                            if expected_type not in actual_type.lower():
+                                errors.append(
+                                    f"  {xml_rel_path}: Line {sourceline}: "
+                                    f"<{elem_name}> references '{rid_attr}' which points to '{actual_type}' "
+                                    f"but should point to a '{expected_type}' relationship"
+                                )
 
             except Exception as e:
                 xml_rel_path = xml_file.relative_to(self.unpacked_dir)
@@ -483,6 +681,17 @@ class BaseSchemaValidator:
                 print("PASSED - All relationship ID references are valid")
             return True
 
+    def _rid_references(self, xml_file):
+        """[element name, r:id, line] for every element of a part with an r:id attribute."""
+        references = []
+        for elem in self._parse(xml_file).getroot().iter():
+            # Check for r:id attribute (relationship ID)
+            rid_attr = elem.get(f"{{{self.OFFICE_RELATIONSHIPS_NAMESPACE}}}id")
+            if rid_attr:
+                elem_name = elem.tag.split("}")[-1] if "}" in elem.tag else elem.tag
+                references.append([elem_name, rid_attr, elem.sourceline])
+        return references
+
     def _get_expected_relationship_type(self, element_name):
         """
         Get the expected relationship type for an element.
@@ -525,13 +734,13 @@ class BaseSchemaValidator:
 
         # Find [Content_Types].xml file
         content_types_file = self.unpacked_dir / "[Content_Types].xml"
-        if not content_types_file.exists():
+        if "[Content_Types].xml" not in self.file_names:
             print("FAILED - [Content_Types].xml file not found")
             return False
 
         try:
             # Parse and get all declared parts and extensions
-            root = lxml.etree.parse(str(content_types_file)).getroot()
+            root = self._parse(content_types_file).getroot()
             declared_parts = set()
             declared_extensions = set()
 
@@ -576,8 +785,7 @@ class BaseSchemaValidator:
             }
 
             # Get all files in the unpacked directory
-            all_files = list(self.unpacked_dir.rglob("*"))
-            all_files = [f for f in all_files if f.is_file()]
+            all_files = [self.unpacked_dir / f for f in self.graph.files]
 
             # Check all XML files for Override declarations
             for xml_file in self.xml_files:
@@ -593,8 +801,7 @@ class BaseSchemaValidator:
                     continue
 
                 try:
-                    root_tag = lxml.etree.parse(str(xml_file)).getroot().tag
-                    root_name = root_tag.split("}")[-1] if "}" in root_tag else root_tag
+                    root_name = self._part_result("root", xml_file, self._root_name)
 
                     if root_name in declarable_roots and path_str not in declared_parts:
                         errors.append(
@@ -638,6 +845,10 @@ class BaseSchemaValidator:
                 )
             return True
 
+    def _root_name(self, xml_file):
+        root_tag = self._parse(xml_file).getroot().tag
+        return root_tag.split("}")[-1] if "}" in root_tag else root_tag
+
     def validate_file_against_xsd(self, xml_file, verbose=False):
         """Validate a single XML file against XSD schema, comparing with original.
 
@@ -673,7 +884,7 @@ class BaseSchemaValidator:
             if verbose:
                 relative_path = xml_file.relative_to(unpacked_dir)
                 print(f"FAILED - {relative_path}: {len(new_errors)} new error(s)")
-                for error in list(new_errors)[:3]:
+                for error in sorted(new_errors)[:3]:
                     truncated = error[:250] + "..." if len(error) > 250 else error
                     print(f"  - {truncated}")
             return False, new_errors
@@ -692,11 +903,9 @@ class BaseSchemaValidator:
         valid_count = 0
         skipped_count = 0
 
-        for xml_file in self.xml_files:
+        results = self._xsd_results()
+        for xml_file, (is_valid, new_file_errors) in zip(self.xml_files, results):
             relative_path = str(xml_file.relative_to(self.unpacked_dir))
-            is_valid, new_file_errors = self.validate_file_against_xsd(
-                xml_file, verbose=False
-            )
 
             if is_valid is None:
                 skipped_count += 1
@@ -712,7 +921,7 @@ class BaseSchemaValidator:
 
             # Has new errors
             new_errors.append(f"  {relative_path}: {len(new_file_errors)} new error(s)")
-            for error in list(new_file_errors)[:3]:  # Show first 3 errors
+            for error in sorted(new_file_errors)[:3]:  # Show first 3 errors
                 new_errors.append(
                     f"    - {error[:250]}..." if len(error) > 250 else f"    - {error}"
                 )
@@ -727,6 +936,8 @@ class BaseSchemaValidator:
             print(
                 f"  - With NEW errors: {len(new_errors) > 0 and len([e for e in new_errors if not e.startswith('    ')]) or 0}"
             )
+            self._print_schema_timings()
+        self._close_original()
 
         if new_errors:
             print("\nFAILED - Found NEW validation errors:")
@@ -738,6 +949,66 @@ class BaseSchemaValidator:
                 print("\nPASSED - No new XSD validation errors introduced")
             return True
 
+    def _xsd_results(self):
+        """`validate_file_against_xsd` results for `self.xml_files`, in order.
+
+        With `jobs` > 1, parts that have a schema are dealt round-robin into one
+        shard per worker process; each worker keeps its own validator (and so its
+        own compiled schemas, parse cache and handle on the original). Results are
+        put back in file order, so output does not depend on scheduling.
+        """
+        results = [(None, set())] * len(self.xml_files)
+        pending = []
+        for i, xml_file in enumerate(self.xml_files):
+            if self._get_schema_path(xml_file) is None:
+                continue
+            stored = self._part_checks(xml_file).get("xsd") if self.incremental else None
+            if stored is not None:
+                results[i] = (stored[0], set(stored[1]))
+            else:
+                pending.append((i, xml_file))
+
+        jobs = min(self.jobs, len(pending))
+        if jobs <= 1:
+            for i, xml_file in pending:
+                results[i] = self.validate_file_against_xsd(xml_file, verbose=False)
+            self._record_xsd_results(pending, results)
+            return results
+
+        shards = [pending[k::jobs] for k in range(jobs)]
+        with ProcessPoolExecutor(
+            max_workers=jobs,
+            initializer=_init_xsd_worker,
+            initargs=(type(self), self.unpacked_dir, self.original_file),
+        ) as pool:
+            for shard_results, timings in pool.map(_validate_xsd_shard, shards):
+                for i, result in shard_results:
+                    results[i] = result
+                for name, counts in timings.items():
+                    total = self.schema_timings.setdefault(name, [0.0, 0.0, 0, 0])
+                    for k, value in enumerate(counts):
+                        total[k] += value
+        self._record_xsd_results(pending, results)
+        return results
+
+    def _record_xsd_results(self, pending, results):
+        if self.incremental:
+            for i, xml_file in pending:
+                is_valid, errors = results[i]
+                self._part_checks(xml_file)["xsd"] = [is_valid, sorted(errors)]
+
+    def _print_schema_timings(self):
+        """Print compile vs validate time per schema (original-file checks included, summed over workers)."""
+        if not self.schema_timings:
+            return
+        print("  XSD timings (compile / validate, parts):")
+        for name, (compile_s, validate_s, count, failed) in sorted(self.schema_timings.items()):
+            if failed:
+                print(f"    {name}: failed to compile ({compile_s * 1000:.1f}ms), {failed} part(s) not validated")
+                continue
+            compiled = f"{compile_s * 1000:.1f}ms" if compile_s else "cached"
+            print(f"    {name}: {compiled} / {validate_s * 1000:.1f}ms, {count} part(s)")
+
     def _get_schema_path(self, xml_file):
         """Determine the appropriate schema path for an XML file."""
         # Check exact filename match
@@ -762,11 +1033,12 @@ class BaseSchemaValidator:
 
         return None
 
-    def _clean_ignorable_namespaces(self, xml_doc):
-        """Remove attributes and elements not in allowed namespaces."""
-        # Create a clean copy
-        xml_string = lxml.etree.tostring(xml_doc, encoding="unicode")
-        xml_copy = lxml.etree.fromstring(xml_string)
+    def _clean_ignorable_namespaces(self, xml_doc, in_place=False):
+        """Remove attributes and elements not in allowed namespaces.
+
+        Works on a copy unless `in_place` is set (for trees the caller already owns).
+        """
+        xml_copy = xml_doc.getroot() if in_place else copy.deepcopy(xml_doc.getroot())
 
         # Remove attributes not in allowed namespaces
         for elem in xml_copy.iter():
@@ -830,31 +1102,45 @@ class BaseSchemaValidator:
             return None, None  # Skip file
 
         try:
-            # Load schema
-            with open(schema_path, "rb") as xsd_file:
-                parser = lxml.etree.XMLParser()
-                xsd_doc = lxml.etree.parse(
-                    xsd_file, parser=parser, base_url=str(schema_path)
-                )
-                schema = lxml.etree.XMLSchema(xsd_doc)
+            xml_doc = self._parse(xml_file)
+        except Exception as e:
+            return False, {str(e)}
+        return self._validate_tree_xsd(
+            xml_doc, schema_path, xml_file.relative_to(base_path)
+        )
 
-            # Load and preprocess XML
-            with open(xml_file, "r") as f:
-                xml_doc = lxml.etree.parse(f)
+    def _validate_tree_xsd(self, xml_doc, schema_path, relative_path):
+        """Validate a parsed part against `schema_path`. Returns (is_valid, errors_set).
 
+        `xml_doc` is not modified.
+        """
+        timing = self.schema_timings.setdefault(schema_path.name, [0.0, 0.0, 0, 0])
+        try:
+            # Load schema (compiled once per process)
+            schema, compile_seconds = _load_schema(schema_path)
+            timing[0] += compile_seconds
+            if isinstance(schema, Exception):
+                timing[3] += 1
+                return False, {str(schema)}
+
+            # Preprocess (template tag removal makes the one private copy that the
+            # following steps modify in place)
             xml_doc, _ = self._remove_template_tags_from_text_nodes(xml_doc)
             xml_doc = self._preprocess_for_mc_ignorable(xml_doc)
 
             # Clean ignorable namespaces if needed
-            relative_path = xml_file.relative_to(base_path)
             if (
                 relative_path.parts
                 and relative_path.parts[0] in self.MAIN_CONTENT_FOLDERS
             ):
-                xml_doc = self._clean_ignorable_namespaces(xml_doc)
+                xml_doc = self._clean_ignorable_namespaces(xml_doc, in_place=True)
 
             # Validate
-            if schema.validate(xml_doc):
+            start = time.perf_counter()
+            is_valid = schema.validate(xml_doc)
+            timing[1] += time.perf_counter() - start
+            timing[2] += 1
+            if is_valid:
                 return True, set()
             else:
                 errors = set()
@@ -866,6 +1152,23 @@ class BaseSchemaValidator:
         except Exception as e:
             return False, {str(e)}
 
+    def _read_original_part(self, relative_path):
+        """Bytes of a part of the original package, or None if it has no such part.
+
+        The original is opened once and parts are read straight from the zip.
+        """
+        if self._original_zip is None:
+            self._original_zip = zipfile.ZipFile(self.original_file, "r")
+        try:
+            return self._original_zip.read(Path(relative_path).as_posix())
+        except KeyError:
+            return None
+
+    def _close_original(self):
+        if self._original_zip is not None:
+            self._original_zip.close()
+            self._original_zip = None
+
     def _get_original_file_errors(self, xml_file):
         """Get XSD validation errors from a single file in the original document.
 
@@ -873,35 +1176,33 @@ class BaseSchemaValidator:
             xml_file: Path to the XML file in unpacked_dir to check
 
         Returns:
-            set: Set of error messages from the original file
+            set: Set of error messages from the original file (memoized per part)
         """
-        import tempfile
-        import zipfile
-
         # Resolve both paths to handle symlinks (e.g., /var vs /private/var on macOS)
         xml_file = Path(xml_file).resolve()
         unpacked_dir = self.unpacked_dir.resolve()
         relative_path = xml_file.relative_to(unpacked_dir)
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = Path(temp_dir)
-
-            # Extract original file
-            with zipfile.ZipFile(self.original_file, "r") as zip_ref:
-                zip_ref.extractall(temp_path)
-
-            # Find corresponding file in original
-            original_xml_file = temp_path / relative_path
+        if relative_path not in self._original_errors:
+            self._original_errors[relative_path] = self._original_part_errors(
+                xml_file, relative_path
+            )
+        return self._original_errors[relative_path]
 
-            if not original_xml_file.exists():
-                # File didn't exist in original, so no original errors
-                return set()
+    def _original_part_errors(self, xml_file, relative_path):
+        schema_path = self._get_schema_path(xml_file)
+        data = self._read_original_part(relative_path)
+        if schema_path is None or data is None:
+            # File didn't exist in original, so no original errors
+            return set()
 
-            # Validate the specific file in original
-            is_valid, errors = self._validate_single_file_xsd(
-                original_xml_file, temp_path
-            )
-            return errors if errors else set()
+        # Validate the specific file in original
+        try:
+            xml_doc = lxml.etree.ElementTree(lxml.etree.fromstring(data))
+        except Exception as e:
+            return {str(e)}
+        is_valid, errors = self._validate_tree_xsd(xml_doc, schema_path, relative_path)
+        return errors if errors else set()
 
     def _remove_template_tags_from_text_nodes(self, xml_doc):
         """Remove template tags from XML text nodes and collect warnings.
@@ -917,8 +1218,7 @@ class BaseSchemaValidator:
         template_pattern = re.compile(r"\{\{[^}]*\}\}")
 
         # Create a copy of the document to avoid modifying the original
-        xml_string = lxml.etree.tostring(xml_doc, encoding="unicode")
-        xml_copy = lxml.etree.fromstring(xml_string)
+        xml_copy = copy.deepcopy(xml_doc.getroot())
 
         def process_text_content(text, content_type):
             if not text:
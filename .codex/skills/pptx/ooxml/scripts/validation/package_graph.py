@@ -0,0 +1,192 @@
+"""
+Relationship graph of an unpacked Office package.
+
+Nodes are the files in the package directory and edges are the relationships
+declared in its .rels files. The graph is built once and shared by the
+validator checks; it is also usable on its own, e.g. to find orphaned parts
+after deleting a slide:
+
+    from validation import PackageGraph
+    print(PackageGraph("unpacked/").unreachable_parts())
+"""
+
+import posixpath
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import lxml.etree
+
+PACKAGE_RELATIONSHIPS_NAMESPACE = (
+    "http://schemas.openxmlformats.org/package/2006/relationships"
+)
+
+
+@dataclass(frozen=True)
+class Relationship:
+    """One <Relationship> of a .rels file."""
+
+    source: str  # part that owns the relationship ("" for the package itself)
+    rels_file: str  # the .rels file it is declared in
+    id: str
+    type: str  # full relationship type URI
+    target: str  # Target attribute as written
+    target_part: Optional[str]  # resolved package path, None for external or empty targets
+    line: int
+
+    @property
+    def type_name(self):
+        """Last segment of the type URI, e.g. "slideLayout"."""
+        return self.type.split("/")[-1]
+
+
+class PackageGraph:
+    """Parts and relationships of an unpacked package, keyed by POSIX paths relative to its root."""
+
+    def __init__(self, root, parse=None, files=None):
+        """
+        Args:
+            root: Unpacked package directory
+            parse: Callable returning the lxml ElementTree of a path (default: lxml.etree.parse),
+                so a caller that already parsed the .rels files can share its trees
+            files: Package file names (POSIX, relative to `root`) if already known, e.g.
+                for a package read from a zip together with a matching `parse`;
+                listed from `root` when omitted
+        """
+        self.root = Path(root).resolve()
+        self._parse = parse or (lambda path: lxml.etree.parse(str(path)))
+
+        # Every file, sorted; parts exclude [Content_Types].xml and the .rels files themselves
+        if files is None:
+            files = (
+                f.relative_to(self.root).as_posix()
+                for f in self.root.rglob("*")
+                if f.is_file()
+            )
+        self.files = sorted(files)
+        self._file_set = set(self.files)
+        self.rels_files = [f for f in self.files if f.endswith(".rels")]
+        self.parts = {
+            f
+            for f in self.files
+            if f != "[Content_Types].xml" and not f.endswith(".rels")
+        }
+
+        # source part -> relationships in document order, or the error parsing its .rels file
+        self._outgoing = {}
+        self._rels_errors = {}
+        self._incoming = {}
+        for rels_file in self.rels_files:
+            source = self.source_of(rels_file)
+            try:
+                rels = self._read_rels(rels_file, source)
+            except Exception as e:
+                self._rels_errors[source] = e
+                continue
+            self._outgoing[source] = rels
+            for rel in rels:
+                if rel.target_part is not None:
+                    self._incoming.setdefault(rel.target_part, []).append(rel)
+
+    @staticmethod
+    def source_of(rels_file):
+        """Part a .rels file belongs to: "dir/_rels/name.rels" -> "dir/name", "_rels/.rels" -> ""."""
+        rels_dir, name = posixpath.split(rels_file)
+        return posixpath.join(posixpath.dirname(rels_dir), name[: -len(".rels")])
+
+    @staticmethod
+    def rels_file_of(source):
+        """The .rels file holding the relationships of `source`."""
+        directory, name = posixpath.split(source)
+        return posixpath.join(directory, "_rels", f"{name}.rels")
+
+    def _read_rels(self, rels_file, source):
+        root = self._parse(self.root / rels_file).getroot()
+        base_dir = posixpath.dirname(source)
+        rels = []
+        for rel in root.findall(f".//{{{PACKAGE_RELATIONSHIPS_NAMESPACE}}}Relationship"):
+            target = rel.get("Target", "")
+            if (
+                not target
+                or rel.get("TargetMode") == "External"
+                or target.startswith(("http", "mailto:"))
+            ):
+                target_part = None
+            elif target.startswith("/"):
+                target_part = posixpath.normpath(target.lstrip("/"))
+            else:
+                target_part = posixpath.normpath(posixpath.join(base_dir, target))
+            rels.append(
+                Relationship(
+                    source=source,
+                    rels_file=rels_file,
+                    id=rel.get("Id", ""),
+                    type=rel.get("Type", ""),
+                    target=target,
+                    target_part=target_part,
+                    line=rel.sourceline,
+                )
+            )
+        return rels
+
+    def has_relationships(self, source):
+        """Whether `source` has a .rels file (parseable or not)."""
+        return source in self._outgoing or source in self._rels_errors
+
+    def relationships_from(self, source, type_name=None):
+        """Relationships declared by `source`, optionally only those whose type URI contains `type_name`.
+
+        Raises the parse error if the .rels file of `source` is malformed.
+        """
+        if source in self._rels_errors:
+            raise self._rels_errors[source]
+        rels = self._outgoing.get(source, [])
+        if type_name is not None:
+            rels = [rel for rel in rels if type_name in rel.type]
+        return rels
+
+    def relationships_to(self, part):
+        """Internal relationships targeting `part`, from parseable .rels files."""
+        return list(self._incoming.get(part, []))
+
+    def broken_relationships(self, source):
+        """Internal relationships of `source` whose target is not a file in the package."""
+        return [
+            rel
+            for rel in self.relationships_from(source)
+            if rel.target_part is not None and rel.target_part not in self._file_set
+        ]
+
+    @property
+    def rels_errors(self):
+        """source part -> exception raised while parsing its .rels file."""
+        return dict(self._rels_errors)
+
+    def referenced_parts(self):
+        """Parts that are the target of at least one relationship."""
+        return {part for part in self._incoming if part in self.parts}
+
+    def unreferenced_parts(self):
+        """Parts no relationship points to, sorted."""
+        return sorted(self.parts - self.referenced_parts())
+
+    def reachable_parts(self):
+        """Parts reachable from the package relationships (_rels/.rels)."""
+        seen = set()
+        pending = [""]
+        while pending:
+            source = pending.pop()
+            for rel in self._outgoing.get(source, []):
+                part = rel.target_part
+                if part is not None and part in self.parts and part not in seen:
+                    seen.add(part)
+                    pending.append(part)
+        return seen
+
+    def unreachable_parts(self):
+        """Parts that cannot be reached from the package root (orphans), sorted.
+
+        Unlike `unreferenced_parts`, this includes parts referenced only by other
+        orphans, e.g. the media of a slide that was removed from presentation.xml.
+        """
+        return sorted(self.parts - self.reachable_parts())
@@ -21,9 +21,10 @@ class RedliningValidator:
 
     def validate(self):
         """Main validation method that returns True if valid, False otherwise."""
-        # Verify unpacked directory exists and has correct structure
+        # Verify unpacked directory (or packed .docx) has correct structure
         modified_file = self.unpacked_dir / "word" / "document.xml"
-        if not modified_file.exists():
+        modified_xml = self._read_modified_document()
+        if modified_xml is None:
             print(f"FAILED - Modified document.xml not found at {modified_file}")
             return False
 
@@ -31,8 +32,7 @@ class RedliningValidator:
         try:
             import xml.etree.ElementTree as ET
 
-            tree = ET.parse(modified_file)
-            root = tree.getroot()
+            root = ET.fromstring(modified_xml)
 
             # Check for w:del or w:ins tags authored by Claude
             del_elements = root.findall(".//w:del", self.namespaces)
@@ -83,8 +83,7 @@ class RedliningValidator:
             try:
                 import xml.etree.ElementTree as ET
 
-                modified_tree = ET.parse(modified_file)
-                modified_root = modified_tree.getroot()
+                modified_root = ET.fromstring(modified_xml)
                 original_tree = ET.parse(original_file)
                 original_root = original_tree.getroot()
             except ET.ParseError as e:
@@ -111,6 +110,19 @@ class RedliningValidator:
                 print("PASSED - All changes by Claude are properly tracked")
             return True
 
+    def _read_modified_document(self):
+        """Bytes of word/document.xml from the unpacked directory or packed .docx, None if missing."""
+        if self.unpacked_dir.is_file():
+            with zipfile.ZipFile(self.unpacked_dir, "r") as zip_ref:
+                try:
+                    return zip_ref.read("word/document.xml")
+                except KeyError:
+                    return None
+        modified_file = self.unpacked_dir / "word" / "document.xml"
+        if not modified_file.exists():
+            return None
+        return modified_file.read_bytes()
+
     def _generate_detailed_diff(self, original_text, modified_text):
         """Generate detailed word-level differences using git word diff."""
         error_parts = [
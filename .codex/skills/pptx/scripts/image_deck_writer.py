@@ -0,0 +1,282 @@
+"""
+Write an image-per-slide PPTX directly as OOXML, without python-pptx.
+
+Emits the minimal package PowerPoint needs -- presentation, one blank layout on
+one master, a theme, and one slide per image -- straight into a zip file. Slides
+and media are written as they are added, so memory stays at one image; media is
+stored uncompressed (PNG/JPEG are already compressed) and identical images share
+one media part.
+
+    with ImageDeckWriter(out_path) as deck:
+        for p in images:
+            deck.add_image_slide(p)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import struct
+import zipfile
+from pathlib import Path
+from typing import Optional
+from xml.sax.saxutils import quoteattr
+
+
+EMU_PER_INCH = 914400
+
+_NS = (
+    'xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships" '
+    'xmlns:p="http://schemas.openxmlformats.org/presentationml/2006/main"'
+)
+_XML_DECL = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+_RT = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_CT = "application/vnd.openxmlformats-officedocument"
+
+_MEDIA_TYPES = {"png": "image/png", "jpeg": "image/jpeg", "gif": "image/gif", "bmp": "image/bmp"}
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# JPEG start-of-frame markers (SOF0-SOF15 minus DHT/JPG/DAC, which share the range).
+_JPEG_SOF = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+_EMPTY_SP_TREE = (
+    '<p:nvGrpSpPr><p:cNvPr id="1" name=""/><p:cNvGrpSpPr/><p:nvPr/></p:nvGrpSpPr>'
+    '<p:grpSpPr><a:xfrm><a:off x="0" y="0"/><a:ext cx="0" cy="0"/>'
+    '<a:chOff x="0" y="0"/><a:chExt cx="0" cy="0"/></a:xfrm></p:grpSpPr>'
+)
+
+_THEME = (
+    _XML_DECL
+    + '<a:theme xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" name="Office Theme">'
+    "<a:themeElements>"
+    '<a:clrScheme name="Office">'
+    '<a:dk1><a:sysClr val="windowText" lastClr="000000"/></a:dk1>'
+    '<a:lt1><a:sysClr val="window" lastClr="FFFFFF"/></a:lt1>'
+    '<a:dk2><a:srgbClr val="44546A"/></a:dk2><a:lt2><a:srgbClr val="E7E6E6"/></a:lt2>'
+    '<a:accent1><a:srgbClr val="4472C4"/></a:accent1><a:accent2><a:srgbClr val="ED7D31"/></a:accent2>'
+    '<a:accent3><a:srgbClr val="A5A5A5"/></a:accent3><a:accent4><a:srgbClr val="FFC000"/></a:accent4>'
+    '<a:accent5><a:srgbClr val="5B9BD5"/></a:accent5><a:accent6><a:srgbClr val="70AD47"/></a:accent6>'
+    '<a:hlink><a:srgbClr val="0563C1"/></a:hlink><a:folHlink><a:srgbClr val="954F72"/></a:folHlink>'
+    "</a:clrScheme>"
+    '<a:fontScheme name="Office">'
+    '<a:majorFont><a:latin typeface="Calibri Light"/><a:ea typeface=""/><a:cs typeface=""/></a:majorFont>'
+    '<a:minorFont><a:latin typeface="Calibri"/><a:ea typeface=""/><a:cs typeface=""/></a:minorFont>'
+    "</a:fontScheme>"
+    '<a:fmtScheme name="Office">'
+    "<a:fillStyleLst>" + '<a:solidFill><a:schemeClr val="phClr"/></a:solidFill>' * 3 + "</a:fillStyleLst>"
+    "<a:lnStyleLst>"
+    + "".join(f'<a:ln w="{w}"><a:solidFill><a:schemeClr val="phClr"/></a:solidFill></a:ln>' for w in (6350, 12700, 19050))
+    + "</a:lnStyleLst>"
+    "<a:effectStyleLst>" + "<a:effectStyle><a:effectLst/></a:effectStyle>" * 3 + "</a:effectStyleLst>"
+    "<a:bgFillStyleLst>" + '<a:solidFill><a:schemeClr val="phClr"/></a:solidFill>' * 3 + "</a:bgFillStyleLst>"
+    "</a:fmtScheme>"
+    "</a:themeElements>"
+    "</a:theme>"
+)
+
+_MASTER = (
+    _XML_DECL
+    + f"<p:sldMaster {_NS}>"
+    '<p:cSld><p:bg><p:bgRef idx="1001"><a:schemeClr val="bg1"/></p:bgRef></p:bg>'
+    f"<p:spTree>{_EMPTY_SP_TREE}</p:spTree></p:cSld>"
+    '<p:clrMap bg1="lt1" tx1="dk1" bg2="lt2" tx2="dk2" accent1="accent1" accent2="accent2" accent3="accent3"'
+    ' accent4="accent4" accent5="accent5" accent6="accent6" hlink="hlink" folHlink="folHlink"/>'
+    '<p:sldLayoutIdLst><p:sldLayoutId id="2147483649" r:id="rId1"/></p:sldLayoutIdLst>'
+    "</p:sldMaster>"
+)
+
+_LAYOUT = (
+    _XML_DECL
+    + f'<p:sldLayout {_NS} type="blank" preserve="1">'
+    f'<p:cSld name="Blank"><p:spTree>{_EMPTY_SP_TREE}</p:spTree></p:cSld>'
+    "<p:clrMapOvr><a:masterClrMapping/></p:clrMapOvr>"
+    "</p:sldLayout>"
+)
+
+_PRES_PROPS = _XML_DECL + f"<p:presentationPr {_NS}/>"
+
+
+def _rels(*rels: tuple[str, str, str]) -> str:
+    body = "".join(f'<Relationship Id="{rid}" Type="{_RT}/{kind}" Target="{target}"/>' for rid, kind, target in rels)
+    return _XML_DECL + f'<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">{body}</Relationships>'
+
+
+def image_header(data: bytes) -> Optional[tuple[str, tuple[int, int]]]:
+    """Return (format, (width, height)) read from a PNG/JPEG/GIF/BMP header, or None if unrecognized."""
+    if data.startswith(_PNG_SIGNATURE) and data[12:16] == b"IHDR":
+        return "png", struct.unpack(">II", data[16:24])
+    if data.startswith(b"\xff\xd8"):
+        i = 2
+        while i + 4 <= len(data):
+            if data[i] != 0xFF:
+                return None
+            marker = data[i + 1]
+            if marker == 0xFF:  # fill byte
+                i += 1
+                continue
+            if marker in (0x01, *range(0xD0, 0xD8)):  # standalone markers
+                i += 2
+                continue
+            (seg_len,) = struct.unpack(">H", data[i + 2 : i + 4])
+            if marker in _JPEG_SOF:
+                h, w = struct.unpack(">HH", data[i + 5 : i + 9])
+                return "jpeg", (w, h)
+            i += 2 + seg_len
+        return None
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        return "gif", struct.unpack("<HH", data[6:10])
+    if data.startswith(b"BM") and len(data) >= 26:
+        w, h = struct.unpack("<ii", data[18:26])
+        return "bmp", (w, abs(h))
+    return None
+
+
+def fit_contain(img_w: int, img_h: int, box_w: int, box_h: int) -> tuple[int, int, int, int]:
+    """Contain-fit rectangle (left, top, width, height) for an image inside a box, same units."""
+    if img_w <= 0 or img_h <= 0:
+        return (0, 0, box_w, box_h)
+    scale = min(box_w / img_w, box_h / img_h)
+    w = int(img_w * scale)
+    h = int(img_h * scale)
+    return (box_w - w) // 2, (box_h - h) // 2, w, h
+
+
+class ImageDeckWriter:
+    def __init__(self, output_path: Path, *, slide_size_in: tuple[float, float] = (13.333, 7.5)):
+        self.output_path = Path(output_path)
+        self.slide_w = int(slide_size_in[0] * EMU_PER_INCH)
+        self.slide_h = int(slide_size_in[1] * EMU_PER_INCH)
+        self._zip: Optional[zipfile.ZipFile] = None
+        self._slides = 0
+        self._media: dict[str, str] = {}  # sha1 -> media part name (e.g. "image3.png")
+        self._media_exts: set[str] = set()
+
+    def __enter__(self) -> "ImageDeckWriter":
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    @property
+    def slide_count(self) -> int:
+        return self._slides
+
+    def open(self) -> None:
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        self._zip = zipfile.ZipFile(self.output_path, "w", compression=zipfile.ZIP_DEFLATED)
+
+    def _write(self, name: str, text: str) -> None:
+        assert self._zip is not None
+        self._zip.writestr(name, text.encode("utf-8"))
+
+    def add_image_slide(self, image_path: Path, *, size: Optional[tuple[int, int]] = None) -> None:
+        """Append a slide showing `image_path` contain-fit; `size` (pixels) overrides the header size."""
+        image_path = Path(image_path)
+        blob = image_path.read_bytes()
+        header = image_header(blob)
+        if header is None:
+            raise ValueError(f"{image_path.name}: unsupported image format (use PNG, JPEG, GIF or BMP)")
+        fmt, header_size = header
+        self.add_image_blob(blob, fmt, size or header_size, name=image_path.name)
+
+    def add_image_blob(self, blob: bytes, fmt: str, size: tuple[int, int], *, name: str = "") -> None:
+        if self._zip is None:
+            raise RuntimeError("writer is not open")
+        if fmt not in _MEDIA_TYPES:
+            raise ValueError(f"unsupported media format: {fmt}")
+
+        sha1 = hashlib.sha1(blob).hexdigest()
+        media = self._media.get(sha1)
+        if media is None:
+            media = f"image{len(self._media) + 1}.{fmt}"
+            self._media[sha1] = media
+            self._media_exts.add(fmt)
+            # Already-compressed image data: store, don't deflate again.
+            self._zip.writestr(zipfile.ZipInfo(f"ppt/media/{media}", date_time=(1980, 1, 1, 0, 0, 0)), blob, zipfile.ZIP_STORED)
+
+        self._slides += 1
+        n = self._slides
+        left, top, cx, cy = fit_contain(size[0], size[1], self.slide_w, self.slide_h)
+        self._write(
+            f"ppt/slides/slide{n}.xml",
+            _XML_DECL
+            + f"<p:sld {_NS}><p:cSld><p:spTree>{_EMPTY_SP_TREE}"
+            f'<p:pic><p:nvPicPr><p:cNvPr id="2" name="Picture 1" descr={quoteattr(name)}/>'
+            '<p:cNvPicPr><a:picLocks noChangeAspect="1"/></p:cNvPicPr><p:nvPr/></p:nvPicPr>'
+            '<p:blipFill><a:blip r:embed="rId2"/><a:stretch><a:fillRect/></a:stretch></p:blipFill>'
+            f'<p:spPr><a:xfrm><a:off x="{left}" y="{top}"/><a:ext cx="{cx}" cy="{cy}"/></a:xfrm>'
+            '<a:prstGeom prst="rect"><a:avLst/></a:prstGeom></p:spPr></p:pic>'
+            "</p:spTree></p:cSld><p:clrMapOvr><a:masterClrMapping/></p:clrMapOvr></p:sld>",
+        )
+        self._write(
+            f"ppt/slides/_rels/slide{n}.xml.rels",
+            _rels(("rId1", "slideLayout", "../slideLayouts/slideLayout1.xml"), ("rId2", "image", f"../media/{media}")),
+        )
+
+    def close(self) -> None:
+        if self._zip is None:
+            return
+        if not self._slides:
+            self.abort()
+            raise ValueError("PPTX has no slides")
+
+        n = self._slides
+        slide_ids = "".join(f'<p:sldId id="{255 + i}" r:id="rId{i + 3}"/>' for i in range(1, n + 1))
+        self._write(
+            "ppt/presentation.xml",
+            _XML_DECL
+            + f'<p:presentation {_NS} saveSubsetFonts="1">'
+            '<p:sldMasterIdLst><p:sldMasterId id="2147483648" r:id="rId1"/></p:sldMasterIdLst>'
+            f"<p:sldIdLst>{slide_ids}</p:sldIdLst>"
+            f'<p:sldSz cx="{self.slide_w}" cy="{self.slide_h}"/><p:notesSz cx="6858000" cy="9144000"/>'
+            "</p:presentation>",
+        )
+        self._write(
+            "ppt/_rels/presentation.xml.rels",
+            _rels(
+                ("rId1", "slideMaster", "slideMasters/slideMaster1.xml"),
+                ("rId2", "theme", "theme/theme1.xml"),
+                ("rId3", "presProps", "presProps.xml"),
+                *((f"rId{i + 3}", "slide", f"slides/slide{i}.xml") for i in range(1, n + 1)),
+            ),
+        )
+        self._write("ppt/presProps.xml", _PRES_PROPS)
+        self._write("ppt/theme/theme1.xml", _THEME)
+        self._write("ppt/slideMasters/slideMaster1.xml", _MASTER)
+        self._write(
+            "ppt/slideMasters/_rels/slideMaster1.xml.rels",
+            _rels(("rId1", "slideLayout", "../slideLayouts/slideLayout1.xml"), ("rId2", "theme", "../theme/theme1.xml")),
+        )
+        self._write("ppt/slideLayouts/slideLayout1.xml", _LAYOUT)
+        self._write("ppt/slideLayouts/_rels/slideLayout1.xml.rels", _rels(("rId1", "slideMaster", "../slideMasters/slideMaster1.xml")))
+        self._write("_rels/.rels", _rels(("rId1", "officeDocument", "ppt/presentation.xml")))
+        self._write("[Content_Types].xml", self._content_types())
+        self._zip.close()
+        self._zip = None
+
+    def _content_types(self) -> str:
+        pml = f"{_CT}.presentationml"
+        defaults = [("rels", "application/vnd.openxmlformats-package.relationships+xml"), ("xml", "application/xml")]
+        defaults += [(ext, _MEDIA_TYPES[ext]) for ext in sorted(self._media_exts)]
+        overrides = [
+            ("/ppt/presentation.xml", f"{pml}.presentation.main+xml"),
+            ("/ppt/presProps.xml", f"{pml}.presProps+xml"),
+            ("/ppt/theme/theme1.xml", f"{_CT}.theme+xml"),
+            ("/ppt/slideMasters/slideMaster1.xml", f"{pml}.slideMaster+xml"),
+            ("/ppt/slideLayouts/slideLayout1.xml", f"{pml}.slideLayout+xml"),
+        ]
+        overrides += [(f"/ppt/slides/slide{i}.xml", f"{pml}.slide+xml") for i in range(1, self._slides + 1)]
+        body = "".join(f'<Default Extension="{e}" ContentType="{t}"/>' for e, t in defaults)
+        body += "".join(f'<Override PartName="{p}" ContentType="{t}"/>' for p, t in overrides)
+        return _XML_DECL + f'<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">{body}</Types>'
+
+    def abort(self) -> None:
+        """Close and delete a partially written file."""
+        if self._zip is not None:
+            self._zip.close()
+            self._zip = None
+        self.output_path.unlink(missing_ok=True)
@@ -5,13 +5,28 @@ Combine slide images into a single PPTX (each slide is the image).
 This is intended as a pragmatic bridge for v2:
 - generate high-quality slide images
 - package them into a PowerPoint deck for distribution
+
+With `--jobs`/`--target-dpi`, images are first normalized in parallel by
+`normalize_images.py` (flatten, downsample, recompress) into a scratch dir.
+
+PNG/JPEG slides take a fast path: each file is read once, sized from its header,
+and stored as a single media part shared by every slide showing the same image.
+The fast path uses python-pptx internals; if they change shape, slides fall back
+to the public `add_picture`.
+`--direct` skips python-pptx entirely and writes the OOXML package itself
+(`image_deck_writer.py`), which is much faster for large decks.
 """
 
 from __future__ import annotations
 
 import argparse
+import functools
+import hashlib
+import inspect
+import io
+import tempfile
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 
 try:
     from pptx import Presentation  # type: ignore[import-not-found]
@@ -20,6 +35,9 @@ except ImportError:
     print("Error: python-pptx not found. Install with: pip install python-pptx")
     raise SystemExit(1)
 
+from image_deck_writer import ImageDeckWriter, fit_contain, image_header
+from normalize_images import PPTX_PAGE_IN, NormalizeOptions, add_normalize_arguments, normalize_images, wants_normalize
+
 
 def _get_image_files(paths: List[str]) -> List[Path]:
     image_extensions = {".png", ".jpg", ".jpeg", ".gif", ".webp", ".bmp"}
@@ -31,64 +49,117 @@ def _get_image_files(paths: List[str]) -> List[Path]:
             if path.suffix.lower() in image_extensions:
                 image_files.append(path)
         elif path.is_dir():
+            found: list[Path] = []
             for ext in image_extensions:
-                image_files.extend(path.glob(f"*{ext}"))
-                image_files.extend(path.glob(f"*{ext.upper()}"))
+                found.extend(path.glob(f"*{ext}"))
+                found.extend(path.glob(f"*{ext.upper()}"))
+            image_files.extend(sorted(found, key=lambda p: p.name))
         else:
             parent = path.parent
             pattern = path.name
             if parent.exists():
-                for match in parent.glob(pattern):
+                for match in sorted(parent.glob(pattern), key=lambda p: p.name):
                     if match.suffix.lower() in image_extensions:
                         image_files.append(match)
 
-    # De-dup and order by filename.
-    return sorted(set(image_files), key=lambda p: p.name)
+    # De-dup; explicit files keep their order (slide_10 must not sort before slide_2).
+    return list(dict.fromkeys(image_files))
 
 
-def _fit_contain(img_w: int, img_h: int, box_w: int, box_h: int) -> tuple[int, int, int, int]:
+class _MediaParts:
     """
-    Compute a contain-fit rectangle for an image inside a box.
-    Returns (left, top, width, height) in the same units.
+    One media part per distinct image (by SHA-1), created without python-pptx's
+    per-image scans of every part in the package.
     """
-    if img_w <= 0 or img_h <= 0:
-        return (0, 0, box_w, box_h)
-    scale = min(box_w / img_w, box_h / img_h)
-    w = int(img_w * scale)
-    h = int(img_h * scale)
-    left = (box_w - w) // 2
-    top = (box_h - h) // 2
-    return left, top, w, h
 
+    _CONTENT_TYPES = {"png": "image/png", "jpeg": "image/jpeg", "gif": "image/gif", "bmp": "image/bmp"}
+
+    def __init__(self, package):
+        self._package = package
+        self._by_sha1: dict = {}
+        self._next_idx = 1 + max(
+            (p.partname.idx or 0 for p in package.iter_parts() if p.partname.startswith("/ppt/media/image")),
+            default=0,
+        )
+
+    def get_or_add(self, blob: bytes, ext: str, filename: str):
+        from pptx.opc.packuri import PackURI  # type: ignore[import-not-found]
+        from pptx.parts.image import ImagePart  # type: ignore[import-not-found]
+
+        sha1 = hashlib.sha1(blob).hexdigest()
+        part = self._by_sha1.get(sha1)
+        if part is None:
+            partname = PackURI(f"/ppt/media/image{self._next_idx}.{ext}")
+            self._next_idx += 1
+            part = ImagePart(partname, self._CONTENT_TYPES[ext], self._package, blob, filename)
+            self._by_sha1[sha1] = part
+        return part
+
+
+@functools.lru_cache(maxsize=None)
+def _fast_path_available() -> bool:
+    """Whether the python-pptx internals used by `_MediaParts`/`_add_picture_fast` look as expected."""
+    try:
+        from pptx.parts.image import ImagePart  # type: ignore[import-not-found]
+        from pptx.shapes.shapetree import SlideShapes  # type: ignore[import-not-found]
+    except ImportError:
+        return False
+    params = list(inspect.signature(ImagePart.__init__).parameters)
+    return params[1:6] == ["partname", "content_type", "package", "blob", "filename"] and hasattr(
+        SlideShapes, "_add_pic_from_image_part"
+    )
+
+
+def _add_picture_fast(slide, media: _MediaParts, blob: bytes, ext: str, filename: str, left, top, width, height):
+    from pptx.opc.constants import RELATIONSHIP_TYPE as RT  # type: ignore[import-not-found]
+
+    part = media.get_or_add(blob, ext, filename)
+    rId = slide.part.relate_to(part, RT.IMAGE)
+    slide.shapes._add_pic_from_image_part(part, rId, left, top, width, height)
 
-def combine_images_to_pptx(image_paths: List[Path], output_path: Path, *, verbose: bool = False) -> None:
+
+def combine_images_to_pptx(
+    image_paths: List[Path],
+    output_path: Path,
+    *,
+    verbose: bool = False,
+    image_sizes: Optional[List[tuple[int, int]]] = None,
+) -> None:
+    """`image_sizes` (pixels, one per image) skips re-probing images whose size is already known."""
     if not image_paths:
         raise ValueError("No image files found")
 
-    try:
-        from PIL import Image  # type: ignore[import-not-found]
-    except ImportError:
-        print("Error: Pillow not found (needed to size images). Install with: pip install Pillow")
-        raise SystemExit(1)
-
     prs = Presentation()
-    prs.slide_width = Inches(13.333)
-    prs.slide_height = Inches(7.5)
+    prs.slide_width = Inches(PPTX_PAGE_IN[0])
+    prs.slide_height = Inches(PPTX_PAGE_IN[1])
 
     slide_w = int(prs.slide_width)
     slide_h = int(prs.slide_height)
     blank = prs.slide_layouts[6]
+    media = _MediaParts(prs.part.package) if _fast_path_available() else None
 
     for i, img_path in enumerate(image_paths, start=1):
         slide = prs.slides.add_slide(blank)
-        try:
-            with Image.open(img_path) as img:
-                img_w, img_h = img.size
-        except Exception:
-            img_w, img_h = (slide_w, slide_h)
+        blob = img_path.read_bytes()
+        header = image_header(blob)
 
-        left, top, width, height = _fit_contain(img_w, img_h, slide_w, slide_h)
-        slide.shapes.add_picture(str(img_path), left, top, width=width, height=height)
+        if image_sizes is not None:
+            img_w, img_h = image_sizes[i - 1]
+        elif header is not None:
+            img_w, img_h = header[1]
+        else:
+            img_w, img_h = _pillow_size(blob, default=(slide_w, slide_h))
+
+        left, top, width, height = fit_contain(img_w, img_h, slide_w, slide_h)
+        fast = header is not None and media is not None
+        if fast:
+            try:
+                _add_picture_fast(slide, media, blob, header[0], img_path.name, left, top, width, height)
+            except (AttributeError, TypeError):
+                media, fast = None, False  # python-pptx internals changed: public API from here on
+        if not fast:
+            # WebP etc. (or no fast path): let python-pptx work out the format.
+            slide.shapes.add_picture(str(img_path), left, top, width=width, height=height)
 
         if verbose:
             print(f"  [{i}/{len(image_paths)}] Added: {img_path.name}")
@@ -97,11 +168,48 @@ def combine_images_to_pptx(image_paths: List[Path], output_path: Path, *, verbos
     prs.save(str(output_path))
 
 
+def combine_images_to_pptx_direct(
+    image_paths: List[Path],
+    output_path: Path,
+    *,
+    verbose: bool = False,
+    image_sizes: Optional[List[tuple[int, int]]] = None,
+) -> None:
+    """Same output as `combine_images_to_pptx`, written by `ImageDeckWriter` (PNG/JPEG/GIF/BMP only)."""
+    if not image_paths:
+        raise ValueError("No image files found")
+
+    with ImageDeckWriter(output_path, slide_size_in=PPTX_PAGE_IN) as deck:
+        for i, img_path in enumerate(image_paths, start=1):
+            deck.add_image_slide(img_path, size=image_sizes[i - 1] if image_sizes is not None else None)
+            if verbose:
+                print(f"  [{i}/{len(image_paths)}] Added: {img_path.name}")
+
+
+def _pillow_size(blob: bytes, *, default: tuple[int, int]) -> tuple[int, int]:
+    try:
+        from PIL import Image  # type: ignore[import-not-found]
+    except ImportError:
+        print("Error: Pillow not found (needed to size images). Install with: pip install Pillow")
+        raise SystemExit(1)
+    try:
+        with Image.open(io.BytesIO(blob)) as img:
+            return img.size
+    except Exception:
+        return default
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(description="Combine slide images into a PPTX presentation")
     parser.add_argument("images", nargs="+", help="Image files, directories, or glob patterns")
     parser.add_argument("-o", "--output", required=True, help="Output PPTX file path")
     parser.add_argument("-v", "--verbose", action="store_true", help="Verbose output")
+    parser.add_argument(
+        "--direct",
+        action="store_true",
+        help="Write the PPTX XML directly instead of through python-pptx (faster for large decks; PNG/JPEG/GIF/BMP)",
+    )
+    add_normalize_arguments(parser)
     args = parser.parse_args()
 
     image_files = _get_image_files(args.images)
@@ -112,7 +220,27 @@ def main() -> int:
     if args.verbose:
         print(f"Found {len(image_files)} image(s)")
 
-    combine_images_to_pptx(image_files, Path(args.output), verbose=bool(args.verbose))
+    combine = combine_images_to_pptx_direct if args.direct else combine_images_to_pptx
+    if not wants_normalize(args):
+        combine(image_files, Path(args.output), verbose=bool(args.verbose))
+    else:
+        options = NormalizeOptions(
+            target_dpi=args.target_dpi,
+            page_in=PPTX_PAGE_IN,
+            format=args.image_format,
+            quality=args.quality,
+        )
+        with tempfile.TemporaryDirectory(prefix="images_to_pptx-") as tmp:
+            scratch = Path(args.scratch_dir) if args.scratch_dir else Path(tmp)
+            normalized = normalize_images(image_files, scratch, options, jobs=args.jobs)
+            if args.verbose:
+                print(f"Normalized {len(normalized)} image(s) into {scratch}")
+            combine(
+                [n.path for n in normalized],
+                Path(args.output),
+                verbose=bool(args.verbose),
+                image_sizes=[(n.width, n.height) for n in normalized],
+            )
     print(str(Path(args.output).resolve()))
     return 0
 
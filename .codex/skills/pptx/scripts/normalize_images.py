@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Normalize slide images before packaging them into a PDF or PPTX.
+
+Each image is flattened onto white (no alpha), optionally downsampled so it is no
+sharper than `--target-dpi` at its printed size, and recompressed (PNG or JPEG).
+Work is spread over a process pool and written to a scratch directory; outputs
+are named by a hash of the source bytes and the settings that affect them, so a
+second exporter (or a rerun) pointed at the same scratch dir reuses them.
+
+Used by `images_to_pptx.py` and the styled-artifacts `slides_to_pdf.py` (via
+`--jobs`), and runnable on its own:
+
+    python normalize_images.py slides/*.png --scratch-dir work/normalized --jobs 8 --target-dpi 150
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+
+FORMATS = ("png", "jpeg")
+
+# Default image-PPTX page (16:9 widescreen), in inches.
+PPTX_PAGE_IN = (13.333, 7.5)
+
+
+@dataclass(frozen=True)
+class NormalizeOptions:
+    target_dpi: Optional[float] = None  # downsample to at most this many pixels per printed inch
+    page_in: Optional[tuple[float, float]] = None  # page the image is contain-fit into; None = sized by source_dpi
+    source_dpi: float = 150  # pixels per inch of an unscaled image (PDF page resolution)
+    format: str = "png"
+    quality: int = 90  # JPEG quality
+
+    def cache_tag(self) -> str:
+        """Settings that change the output bytes (page geometry only matters when downsampling)."""
+        parts = [self.format]
+        if self.format == "jpeg":
+            parts.append(f"q{self.quality}")
+        if self.target_dpi is not None:
+            parts.append(f"dpi{self.target_dpi:g}")
+            parts.append(f"page{self.page_in}" if self.page_in else f"src{self.source_dpi:g}")
+        return "-".join(parts)
+
+
+@dataclass(frozen=True)
+class NormalizedImage:
+    source: Path
+    path: Path
+    width: int
+    height: int
+    source_width: int
+    source_height: int
+
+
+def _target_size(w: int, h: int, options: NormalizeOptions) -> tuple[int, int]:
+    if options.target_dpi is None or w <= 0 or h <= 0:
+        return w, h
+    if options.page_in is not None:
+        page_w, page_h = options.page_in
+        printed_w = min(page_w, page_h * w / h)
+    else:
+        printed_w = w / options.source_dpi
+    max_w = max(1, round(printed_w * options.target_dpi))
+    if w <= max_w:
+        return w, h
+    return max_w, max(1, round(h * max_w / w))
+
+
+def _normalize_one(source: Path, scratch_dir: Path, options: NormalizeOptions) -> NormalizedImage:
+    from PIL import Image
+
+    h = hashlib.sha256()
+    with source.open("rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    h.update(options.cache_tag().encode("ascii"))
+    ext = "jpg" if options.format == "jpeg" else "png"
+    out = scratch_dir / f"{source.stem}-{h.hexdigest()[:16]}.{ext}"
+
+    with Image.open(source) as img:
+        src_w, src_h = img.size
+        if out.exists():
+            with Image.open(out) as done:
+                return NormalizedImage(source, out, done.width, done.height, src_w, src_h)
+
+        if img.mode in ("RGBA", "LA", "P", "PA") or "transparency" in img.info:
+            rgba = img.convert("RGBA")
+            flat = Image.new("RGB", rgba.size, (255, 255, 255))
+            flat.paste(rgba, mask=rgba.split()[-1])
+        elif img.mode not in ("RGB", "L"):
+            flat = img.convert("RGB")
+        else:
+            flat = img.copy()
+
+    size = _target_size(src_w, src_h, options)
+    if size != flat.size:
+        flat = flat.resize(size, Image.Resampling.LANCZOS)
+
+    # Write-then-rename so concurrent exporters sharing a scratch dir never read a partial file.
+    fd, tmp = tempfile.mkstemp(dir=scratch_dir, suffix=f".{ext}.tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            if options.format == "jpeg":
+                flat.save(f, "JPEG", quality=options.quality, optimize=True)
+            else:
+                flat.save(f, "PNG", compress_level=6)
+        os.replace(tmp, out)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+    return NormalizedImage(source, out, flat.width, flat.height, src_w, src_h)
+
+
+def normalize_images(
+    image_paths: list[Path],
+    scratch_dir: Path,
+    options: Optional[NormalizeOptions] = None,
+    *,
+    jobs: Optional[int] = None,
+) -> list[NormalizedImage]:
+    """Normalize `image_paths` into `scratch_dir` using `jobs` processes (default: CPU count). Order is preserved."""
+    options = options or NormalizeOptions()
+    if options.format not in FORMATS:
+        raise ValueError(f"unsupported format: {options.format}")
+    scratch_dir.mkdir(parents=True, exist_ok=True)
+    paths = [Path(p) for p in image_paths]
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(paths) or 1))
+    if jobs == 1:
+        return [_normalize_one(p, scratch_dir, options) for p in paths]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(_normalize_one, paths, [scratch_dir] * len(paths), [options] * len(paths)))
+
+
+def add_normalize_arguments(parser: argparse.ArgumentParser) -> None:
+    """The `--jobs`/`--target-dpi`/... flags shared by the exporters."""
+    parser.add_argument("--jobs", type=int, help="Normalize images in N worker processes before assembly (default: CPU count when normalizing)")
+    parser.add_argument("--target-dpi", type=float, help="Downsample images to at most this DPI at their printed size")
+    parser.add_argument("--image-format", choices=FORMATS, default="png", help="Recompress normalized images as PNG (default) or JPEG")
+    parser.add_argument("--quality", type=int, default=90, help="JPEG quality for --image-format jpeg (default: 90)")
+    parser.add_argument("--scratch-dir", help="Directory for normalized images (default: a temporary directory); reused across runs")
+
+
+def wants_normalize(args: argparse.Namespace) -> bool:
+    return any(
+        v is not None for v in (args.jobs, args.target_dpi, args.scratch_dir)
+    ) or args.image_format != "png"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Flatten, downsample and recompress slide images in parallel")
+    parser.add_argument("images", nargs="+", help="Image files")
+    add_normalize_arguments(parser)
+    parser.add_argument("--source-dpi", type=float, default=150, help="Pixels per inch of an unscaled image (default: 150)")
+    parser.add_argument("--pptx-page", action="store_true", help="Size against a 13.333x7.5in PPTX page instead of --source-dpi")
+    args = parser.parse_args()
+    if args.scratch_dir is None:
+        parser.error("--scratch-dir is required")
+
+    options = NormalizeOptions(
+        target_dpi=args.target_dpi,
+        page_in=PPTX_PAGE_IN if args.pptx_page else None,
+        source_dpi=args.source_dpi,
+        format=args.image_format,
+        quality=args.quality,
+    )
+    for n in normalize_images([Path(p) for p in args.images], Path(args.scratch_dir), options, jobs=args.jobs):
+        print(n.path)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
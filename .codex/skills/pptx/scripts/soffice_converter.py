@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+"""
+Shared headless LibreOffice converter used by thumbnail.py and ooxml/scripts/pack.py.
+
+The first conversion starts one soffice listener (UNO socket) and leaves it
+running in the background, so later conversions - also from later processes -
+skip the multi-second cold start. A detached watchdog stops it after
+IDLE_TIMEOUT seconds without conversions. Its state lives in STATE_DIR:
+
+- server.json: pid, port and start time of the listener (checked before it is signalled,
+  since a dead listener's pid can be reused) and when it was last used
+- lock: conversions are queued on this file (one at a time per listener)
+- profile/: a private LibreOffice profile, so a desktop LibreOffice is not disturbed
+
+A listener that died or hung is restarted. Without the UNO Python bindings
+(`import uno`, shipped with LibreOffice), or with SOFFICE_CONVERTER=oneshot,
+every call falls back to a one-shot `soffice --headless --convert-to`.
+
+Usage:
+    python soffice_converter.py start|status|stop
+"""
+
+import argparse
+import contextlib
+import getpass
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows: only callers within one process are queued
+    fcntl = None
+
+try:
+    import uno  # type: ignore[import-not-found]
+    from com.sun.star.beans import PropertyValue  # type: ignore[import-not-found]
+    from com.sun.star.io import IOException as UnoIOException  # type: ignore[import-not-found]
+    from com.sun.star.lang import IllegalArgumentException  # type: ignore[import-not-found]
+except ImportError:
+    uno = None
+
+STATE_DIR = Path(tempfile.gettempdir()) / f"soffice-converter-{getpass.getuser()}"
+MODE_ENV = "SOFFICE_CONVERTER"  # "oneshot" disables the shared listener
+START_TIMEOUT = 60  # seconds for a new listener to accept connections
+IDLE_TIMEOUT = 15 * 60  # seconds without conversions before the listener is stopped
+
+# Export filter for `convert_to="pdf"`, by document service
+PDF_FILTERS = {
+    "com.sun.star.presentation.PresentationDocument": "impress_pdf_Export",
+    "com.sun.star.text.TextDocument": "writer_pdf_Export",
+    "com.sun.star.sheet.SpreadsheetDocument": "calc_pdf_Export",
+    "com.sun.star.drawing.DrawingDocument": "draw_pdf_Export",
+}
+
+_thread_lock = threading.Lock()
+
+
+class ConversionError(RuntimeError):
+    """soffice could not convert a document."""
+
+
+class _ServerUnavailable(Exception):
+    """The listener could not be started or keeps failing."""
+
+
+def convert(input_path, output_dir, convert_to, timeout=None):
+    """Convert a document like `soffice --headless --convert-to <convert_to> --outdir <output_dir>`.
+
+    Args:
+        input_path: Document to convert
+        output_dir: Directory receiving `<stem>.<ext>`
+        convert_to: Target in soffice syntax, e.g. "pdf" or "html:impress_html_Export"
+        timeout: Seconds allowed for the conversion itself (not the listener start)
+
+    Returns:
+        Path of the converted file.
+
+    Raises:
+        ConversionError: The document could not be converted
+        FileNotFoundError: soffice is not installed
+        subprocess.TimeoutExpired: The conversion took longer than `timeout`
+    """
+    input_path = Path(input_path).resolve()
+    output_dir = Path(output_dir).resolve()
+    output_path = output_dir / f"{input_path.stem}.{convert_to.split(':')[0]}"
+
+    if uno is not None and os.environ.get(MODE_ENV) != "oneshot":
+        try:
+            with _queue():
+                _convert_with_server(input_path, output_path, convert_to, timeout)
+            return output_path
+        except _ServerUnavailable:
+            pass
+    return _convert_oneshot(input_path, output_dir, output_path, convert_to, timeout)
+
+
+def _convert_oneshot(input_path, output_dir, output_path, convert_to, timeout):
+    result = subprocess.run(
+        [
+            "soffice",
+            "--headless",
+            "--convert-to",
+            convert_to,
+            "--outdir",
+            str(output_dir),
+            str(input_path),
+        ],
+        capture_output=True,
+        timeout=timeout,
+        text=True,
+    )
+    if result.returncode != 0 or not output_path.exists():
+        raise ConversionError(result.stderr.strip() or "Document conversion failed")
+    return output_path
+
+
+@contextlib.contextmanager
+def _queue():
+    """Hold the listener for one conversion: threads wait on a lock, processes on the lock file."""
+    with _thread_lock:
+        STATE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(STATE_DIR / "lock", "w") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield
+
+
+def _convert_with_server(input_path, output_path, convert_to, timeout):
+    # A second failure right after a restart means the listener is not usable here
+    for _ in range(2):
+        desktop = _connect_running() or _start_server()
+        executor = ThreadPoolExecutor(max_workers=1)
+        future = executor.submit(_store, desktop, input_path, output_path, convert_to)
+        try:
+            future.result(timeout=timeout)
+            return
+        except FutureTimeoutError:
+            _stop_server()  # unblocks the hung call
+            raise subprocess.TimeoutExpired("soffice", timeout)
+        except ConversionError:
+            raise
+        except Exception:
+            _stop_server()  # listener crashed or the connection dropped
+        finally:
+            executor.shutdown(wait=False)
+    raise _ServerUnavailable()
+
+
+def _store(desktop, input_path, output_path, convert_to):
+    try:
+        doc = desktop.loadComponentFromURL(
+            input_path.as_uri(), "_blank", 0, _properties(Hidden=True, ReadOnly=True)
+        )
+    except (IllegalArgumentException, UnoIOException) as e:
+        raise ConversionError(f"Could not load {input_path.name}: {e.Message}")
+    if doc is None:
+        raise ConversionError(f"Could not load {input_path.name}")
+    try:
+        doc.storeToURL(
+            output_path.as_uri(),
+            _properties(FilterName=_filter_name(doc, convert_to), Overwrite=True),
+        )
+    except UnoIOException as e:
+        raise ConversionError(f"Could not export {input_path.name}: {e.Message}")
+    finally:
+        doc.close(True)
+
+
+def _filter_name(doc, convert_to):
+    parts = convert_to.split(":")
+    if len(parts) > 1:
+        return parts[1]
+    if parts[0] == "pdf":
+        for service, filter_name in PDF_FILTERS.items():
+            if doc.supportsService(service):
+                return filter_name
+    raise ConversionError(f"No default export filter for '{convert_to}'")
+
+
+def _properties(**values):
+    props = []
+    for name, value in values.items():
+        prop = PropertyValue()
+        prop.Name = name
+        prop.Value = value
+        props.append(prop)
+    return tuple(props)
+
+
+def _write_state(state):
+    # Replaced atomically: the watchdog reads it without holding the lock
+    path = STATE_DIR / "server.json"
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(state))
+    os.replace(tmp, path)
+
+
+def _read_state():
+    try:
+        return json.loads((STATE_DIR / "server.json").read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def _connect(port):
+    local = uno.getComponentContext()
+    resolver = local.ServiceManager.createInstanceWithContext(
+        "com.sun.star.bridge.UnoUrlResolver", local
+    )
+    ctx = resolver.resolve(
+        f"uno:socket,host=127.0.0.1,port={port};urp;StarOffice.ComponentContext"
+    )
+    return ctx.ServiceManager.createInstanceWithContext("com.sun.star.frame.Desktop", ctx)
+
+
+def _connect_running():
+    """Desktop of the running listener, or None if there is none (or it does not answer)."""
+    state = _read_state()
+    if state is None:
+        return None
+    if not _is_listener(state):
+        _stop_server()  # stale: only removes server.json
+        return None
+    try:
+        desktop = _connect(state["port"])
+    except Exception:
+        _stop_server()
+        return None
+    _write_state({**state, "last_used": time.time()})
+    return desktop
+
+
+def _start_server():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    profile = (STATE_DIR / "profile").resolve()
+    process = subprocess.Popen(
+        [
+            "soffice",
+            "--headless",
+            "--invisible",
+            "--nologo",
+            "--norestore",
+            "--nodefault",
+            f"-env:UserInstallation={profile.as_uri()}",
+            f"--accept=socket,host=127.0.0.1,port={port};urp;StarOffice.ComponentContext",
+        ],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,  # outlives this process; killed as a group
+    )
+    _write_state(
+        {
+            "pid": process.pid,
+            "port": port,
+            "started": _process_start(process.pid),
+            "last_used": time.time(),
+        }
+    )
+
+    deadline = time.monotonic() + START_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            break
+        try:
+            desktop = _connect(port)
+        except Exception:
+            time.sleep(0.25)
+            continue
+        subprocess.Popen(
+            [sys.executable, str(Path(__file__).resolve()), "_watch", str(process.pid)],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+        print(
+            f"Started soffice listener (pid {process.pid}); it stops after "
+            f"{IDLE_TIMEOUT // 60} idle minutes or with `{Path(__file__).name} stop`",
+            file=sys.stderr,
+        )
+        return desktop
+    _stop_server()
+    raise _ServerUnavailable()
+
+
+def _stop_server():
+    state = _read_state()
+    with contextlib.suppress(FileNotFoundError):
+        (STATE_DIR / "server.json").unlink()
+    if state is None or not _is_listener(state):
+        return
+    with contextlib.suppress(OSError):
+        if hasattr(os, "killpg"):
+            os.killpg(state["pid"], signal.SIGTERM)  # soffice wrapper and soffice.bin
+        else:
+            os.kill(state["pid"], signal.SIGTERM)
+
+
+def _watch(pid):
+    """Stop listener `pid` once it has been idle for IDLE_TIMEOUT; exits when it is gone or replaced."""
+    while True:
+        time.sleep(min(IDLE_TIMEOUT, 60))
+        state = _read_state()
+        if state is None or state["pid"] != pid or not _is_listener(state):
+            return
+        if time.time() - state["last_used"] < IDLE_TIMEOUT:
+            continue
+        with _queue():  # not while a conversion is running
+            state = _read_state()
+            if state and state["pid"] == pid and time.time() - state["last_used"] >= IDLE_TIMEOUT:
+                _stop_server()
+                return
+
+
+def _is_listener(state):
+    """Whether the pid in server.json still is the listener that wrote it."""
+    command = _process_command(state["pid"])
+    if command is None:
+        return False
+    if os.name == "nt":
+        return "soffice" in command.lower()  # tasklist only shows the image name
+    # The accept string carries our port; the start time rules out a reused pid
+    started = _process_start(state["pid"])
+    return f"port={state['port']};urp" in command and state.get("started") == started
+
+
+def _process_command(pid):
+    """Command line of a running process (image name on Windows), or None."""
+    if Path("/proc/self").exists():
+        try:
+            cmdline = Path(f"/proc/{pid}/cmdline").read_bytes()
+        except OSError:
+            return None
+        return cmdline.replace(b"\0", b" ").decode(errors="replace")
+    if os.name == "nt":
+        cmd = ["tasklist", "/FI", f"PID eq {pid}", "/FO", "CSV", "/NH"]
+    else:
+        cmd = ["ps", "-p", str(pid), "-o", "command="]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def _process_start(pid):
+    """Start time of a process in clock ticks since boot (Linux), else None."""
+    try:
+        stat = Path(f"/proc/{pid}/stat").read_text()
+    except OSError:
+        return None
+    return int(stat.rsplit(")", 1)[1].split()[19])  # field 22; the command name may contain spaces
+
+
+def main():
+    if sys.argv[1:2] == ["_watch"]:  # internal: started detached by _start_server
+        _watch(int(sys.argv[2]))
+        return
+
+    parser = argparse.ArgumentParser(
+        description="Manage the shared soffice conversion listener"
+    )
+    parser.add_argument("command", choices=["start", "status", "stop"])
+    args = parser.parse_args()
+
+    if args.command == "stop":
+        with _queue():
+            _stop_server()
+        print("Stopped")
+        return
+
+    if uno is None:
+        print("UNO bindings not available: conversions run one-shot soffice")
+        sys.exit(1 if args.command == "start" else 0)
+
+    with _queue():
+        running = _connect_running() is not None
+        if args.command == "start" and not running:
+            try:
+                _start_server()
+            except _ServerUnavailable:
+                sys.exit("Error: soffice listener did not start")
+            running = True
+    state = _read_state()
+    if running and state:
+        print(
+            f"Running: pid {state['pid']}, port {state['port']} "
+            f"(stops after {IDLE_TIMEOUT // 60} idle minutes)"
+        )
+    else:
+        print("Not running")
+
+
+if __name__ == "__main__":
+    main()
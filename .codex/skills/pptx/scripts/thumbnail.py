@@ -18,8 +18,15 @@ Grid limits by column count:
 - 5 cols: max 30 slides per grid (5×6) [default]
 - 6 cols: max 42 slides per grid (6×7)
 
+Only some slides can be rendered: --slides picks slides by index (0-based, as
+labelled in the grid), and --changed-since keeps rendered slides in a cache next
+to a manifest file so later runs only rasterize slides whose XML (or a part it
+uses, such as its layout or images) changed. When nothing changed, soffice is
+not run at all.
+
 Usage:
     python thumbnail.py input.pptx [output_prefix] [--cols N] [--outline-placeholders]
+                        [--slides 3,7-9] [--changed-since MANIFEST]
 
 Examples:
     python thumbnail.py presentation.pptx
@@ -38,9 +45,16 @@ Examples:
 
     python thumbnail.py template.pptx analysis --outline-placeholders
     # Creates thumbnail grids with red outlines around text placeholders
+
+    python thumbnail.py deck.pptx work/grid --changed-since work/thumb-cache/manifest.json
+    # First run renders every slide and writes the manifest; later runs only
+    # rasterize slides changed since then and reuse the cached images
 """
 
 import argparse
+import hashlib
+import json
+import shutil
 import subprocess
 import sys
 import tempfile
@@ -49,6 +63,7 @@ from pathlib import Path
 from inventory import extract_text_inventory
 from PIL import Image, ImageDraw, ImageFont
 from pptx import Presentation
+from soffice_converter import convert
 
 # Constants
 THUMBNAIL_WIDTH = 300  # Fixed thumbnail width in pixels
@@ -86,6 +101,17 @@ def main():
         action="store_true",
         help="Outline text placeholders with a colored border",
     )
+    parser.add_argument(
+        "--slides",
+        type=parse_slide_list,
+        help="Only these slides, by 0-based index (e.g. 3,7-9)",
+    )
+    parser.add_argument(
+        "--changed-since",
+        metavar="MANIFEST",
+        help="Reuse slide images cached next to MANIFEST (written by a previous run, "
+        "created if missing) and only rasterize slides that changed",
+    )
 
     args = parser.parse_args()
 
@@ -119,7 +145,14 @@ def main():
                     print(f"Found placeholders on {len(placeholder_regions)} slides")
 
             # Convert slides to images
-            slide_images = convert_to_images(input_path, Path(temp_dir), CONVERSION_DPI)
+            manifest_path = Path(args.changed_since) if args.changed_since else None
+            slide_images = convert_to_images(
+                input_path,
+                Path(temp_dir),
+                CONVERSION_DPI,
+                slides=args.slides,
+                manifest_path=manifest_path,
+            )
             if not slide_images:
                 print("Error: No slides found")
                 sys.exit(1)
@@ -128,12 +161,13 @@ def main():
 
             # Create grids (max cols×(cols+1) images per grid)
             grid_files = create_grids(
-                slide_images,
+                [image for _, image in slide_images],
                 cols,
                 THUMBNAIL_WIDTH,
                 output_path,
                 placeholder_regions,
                 slide_dimensions,
+                slide_numbers=[num for num, _ in slide_images],
             )
 
             # Print saved files
@@ -194,12 +228,43 @@ def get_placeholder_regions(pptx_path):
     return placeholder_regions, (slide_width_inches, slide_height_inches)
 
 
-def convert_to_images(pptx_path, temp_dir, dpi):
-    """Convert PowerPoint to images via PDF, handling hidden slides."""
+def parse_slide_list(text):
+    """Parse "3,7-9" into [3, 7, 8, 9] (sorted, without duplicates)."""
+    slides = set()
+    try:
+        for item in text.split(","):
+            first, _, last = item.strip().partition("-")
+            start = int(first)
+            end = int(last) if last else start
+            if start < 0 or end < start:
+                raise ValueError
+            slides.update(range(start, end + 1))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid slide list: '{text}'")
+    return sorted(slides)
+
+
+def convert_to_images(pptx_path, temp_dir, dpi, slides=None, manifest_path=None):
+    """Convert PowerPoint to images via PDF, handling hidden slides.
+
+    Args:
+        slides: 0-based indices of the slides to return (default: all)
+        manifest_path: Cache slide images by slide hash next to this manifest and
+            only rasterize slides that are not cached yet
+
+    Returns:
+        List of (0-based slide index, image path) in slide order.
+    """
     # Detect hidden slides
     print("Analyzing presentation...")
     prs = Presentation(str(pptx_path))
     total_slides = len(prs.slides)
+    if slides is None:
+        slides = range(total_slides)
+    elif slides and slides[-1] >= total_slides:
+        raise ValueError(
+            f"Slide {slides[-1]} out of range (the deck has {total_slides} slides)"
+        )
 
     # Find hidden slides (1-based indexing for display)
     hidden_slides = {
@@ -212,65 +277,190 @@ def convert_to_images(pptx_path, temp_dir, dpi):
     if hidden_slides:
         print(f"Hidden slides: {sorted(hidden_slides)}")
 
-    pdf_path = temp_dir / f"{pptx_path.stem}.pdf"
-
-    # Convert to PDF
-    print("Converting to PDF...")
-    result = subprocess.run(
-        [
-            "soffice",
-            "--headless",
-            "--convert-to",
-            "pdf",
-            "--outdir",
-            str(temp_dir),
-            str(pptx_path),
-        ],
-        capture_output=True,
-        text=True,
-    )
-    if result.returncode != 0 or not pdf_path.exists():
-        raise RuntimeError("PDF conversion failed")
-
-    # Convert PDF to images
-    print(f"Converting to images at {dpi} DPI...")
-    result = subprocess.run(
-        ["pdftoppm", "-jpeg", "-r", str(dpi), str(pdf_path), str(temp_dir / "slide")],
-        capture_output=True,
-        text=True,
-    )
-    if result.returncode != 0:
-        raise RuntimeError("Image conversion failed")
+    # PDF page of each visible slide (hidden slides are not exported)
+    pdf_pages = {}
+    for slide_num in range(1, total_slides + 1):
+        if slide_num not in hidden_slides:
+            pdf_pages[slide_num] = len(pdf_pages) + 1
+
+    # Reuse cached images of unchanged slides
+    visible_images = {}
+    cache = None
+    if manifest_path is not None:
+        cache = SlideImageCache(manifest_path, slide_hashes(prs, dpi))
+        for idx in slides:
+            cached = cache.get(idx)
+            if idx + 1 in pdf_pages and cached is not None:
+                visible_images[idx + 1] = cached
+        print(f"Reusing {len(visible_images)} cached slide image(s)")
+    to_render = [
+        idx + 1
+        for idx in slides
+        if idx + 1 in pdf_pages and idx + 1 not in visible_images
+    ]
+
+    if to_render:
+        # Convert to PDF (through the shared soffice listener when available)
+        print("Converting to PDF...")
+        pdf_path = convert(pptx_path, temp_dir, "pdf")
+
+        # Convert only the needed PDF pages to images
+        print(f"Converting {len(to_render)} slide(s) to images at {dpi} DPI...")
+        page_images = rasterize_pages(
+            pdf_path, [pdf_pages[num] for num in to_render], temp_dir, dpi
+        )
+        for slide_num in to_render:
+            image = page_images.get(pdf_pages[slide_num])
+            if image is not None:
+                visible_images[slide_num] = image
+                if cache is not None:
+                    cache.put(slide_num - 1, image)
 
-    visible_images = sorted(temp_dir.glob("slide-*.jpg"))
+    if cache is not None:
+        cache.save()
 
     # Create full list with placeholders for hidden slides
     all_images = []
-    visible_idx = 0
 
     # Get placeholder dimensions from first visible slide
     if visible_images:
-        with Image.open(visible_images[0]) as img:
+        with Image.open(visible_images[min(visible_images)]) as img:
             placeholder_size = img.size
     else:
         placeholder_size = (1920, 1080)
 
-    for slide_num in range(1, total_slides + 1):
+    for idx in slides:
+        slide_num = idx + 1
         if slide_num in hidden_slides:
             # Create placeholder image for hidden slide
             placeholder_path = temp_dir / f"hidden-{slide_num:03d}.jpg"
             placeholder_img = create_hidden_slide_placeholder(placeholder_size)
             placeholder_img.save(placeholder_path, "JPEG")
-            all_images.append(placeholder_path)
-        else:
+            all_images.append((idx, placeholder_path))
+        elif slide_num in visible_images:
             # Use the actual visible slide image
-            if visible_idx < len(visible_images):
-                all_images.append(visible_images[visible_idx])
-                visible_idx += 1
+            all_images.append((idx, visible_images[slide_num]))
 
     return all_images
 
 
+def rasterize_pages(pdf_path, pages, temp_dir, dpi):
+    """Render 1-based PDF pages with pdftoppm, one call per run of consecutive pages.
+
+    Returns a dict of page number -> JPEG path.
+    """
+    runs = []
+    for page in sorted(set(pages)):
+        if runs and page == runs[-1][1] + 1:
+            runs[-1][1] = page
+        else:
+            runs.append([page, page])
+
+    for first, last in runs:
+        result = subprocess.run(
+            [
+                "pdftoppm",
+                "-jpeg",
+                "-r",
+                str(dpi),
+                "-f",
+                str(first),
+                "-l",
+                str(last),
+                str(pdf_path),
+                str(temp_dir / "slide"),
+            ],
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            raise RuntimeError("Image conversion failed")
+
+    # pdftoppm zero-pads page numbers to the width of the page count
+    return {int(f.stem.rsplit("-", 1)[1]): f for f in temp_dir.glob("slide-*.jpg")}
+
+
+def slide_hashes(prs, dpi):
+    """Hash of everything that affects how each slide renders, in slide order.
+
+    Covers the slide XML and every part it reaches through relationships (layout,
+    master, theme, images, charts, ...), except other slides and notes.
+    """
+    part_digests = {}
+
+    def part_digest(part):
+        if part.partname not in part_digests:
+            part_digests[part.partname] = hashlib.sha1(part.blob).digest()
+        return part_digests[part.partname]
+
+    hashes = []
+    for idx, slide in enumerate(prs.slides):
+        h = hashlib.sha1(f"{dpi}:{prs.slide_width}x{prs.slide_height}".encode())
+        if b'type="slidenum"' in slide.part.blob:
+            h.update(f"#{idx}".encode())  # shows its own slide number
+        seen = {slide.part.partname}
+        pending = [slide.part]
+        while pending:
+            part = pending.pop()
+            h.update(part.partname.encode())
+            h.update(part_digest(part))
+            for _, rel in sorted(part.rels.items()):
+                if rel.is_external:
+                    h.update(rel.target_ref.encode())
+                    continue
+                target = rel.target_part
+                if target.partname in seen or target.partname.startswith(
+                    ("/ppt/slides/", "/ppt/notesSlides/")
+                ):
+                    continue
+                seen.add(target.partname)
+                pending.append(target)
+        hashes.append(h.hexdigest())
+    return hashes
+
+
+class SlideImageCache:
+    """Slide images keyed by slide hash, stored next to a JSON manifest.
+
+    The manifest lists the hash and image of each slide of the last run;
+    images of slides no longer in the deck are deleted on save.
+    """
+
+    def __init__(self, manifest_path, hashes):
+        self.manifest_path = manifest_path
+        self.cache_dir = manifest_path.parent
+        self.hashes = hashes
+        self.images = {}  # slide hash -> image file name
+        if manifest_path.exists():
+            manifest = json.loads(manifest_path.read_text())
+            self.images = {s["hash"]: s["image"] for s in manifest["slides"]}
+
+    def get(self, idx):
+        """Cached image of slide `idx` if its hash is unchanged, else None."""
+        name = self.images.get(self.hashes[idx])
+        if name is None or not (self.cache_dir / name).exists():
+            return None
+        return self.cache_dir / name
+
+    def put(self, idx, image_path):
+        name = f"{self.hashes[idx]}.jpg"
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(image_path, self.cache_dir / name)
+        self.images[self.hashes[idx]] = name
+
+    def save(self):
+        slides = [
+            {"index": idx, "hash": h, "image": self.images[h]}
+            for idx, h in enumerate(self.hashes)
+            if h in self.images
+        ]
+        kept = {s["image"] for s in slides}
+        for name in set(self.images.values()) - kept:
+            (self.cache_dir / name).unlink(missing_ok=True)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.manifest_path.write_text(json.dumps({"slides": slides}, indent=2))
+
+
 def create_grids(
     image_paths,
     cols,
@@ -278,8 +468,12 @@ def create_grids(
     output_path,
     placeholder_regions=None,
     slide_dimensions=None,
+    slide_numbers=None,
 ):
-    """Create multiple thumbnail grids from slide images, max cols×(cols+1) images per grid."""
+    """Create multiple thumbnail grids from slide images, max cols×(cols+1) images per grid.
+
+    `slide_numbers` labels each image with its slide index (default: 0, 1, ...).
+    """
     # Maximum images per grid is cols × (cols + 1) for better proportions
     max_images_per_grid = cols * (cols + 1)
     grid_files = []
@@ -297,7 +491,13 @@ def create_grids(
 
         # Create grid for this chunk
         grid = create_grid(
-            chunk_images, cols, width, start_idx, placeholder_regions, slide_dimensions
+            chunk_images,
+            cols,
+            width,
+            start_idx,
+            placeholder_regions,
+            slide_dimensions,
+            slide_numbers[start_idx:end_idx] if slide_numbers is not None else None,
         )
 
         # Generate output filename
@@ -325,8 +525,12 @@ def create_grid(
     start_slide_num=0,
     placeholder_regions=None,
     slide_dimensions=None,
+    slide_numbers=None,
 ):
     """Create thumbnail grid from slide images with optional placeholder outlining."""
+    if slide_numbers is None:
+        slide_numbers = range(start_slide_num, start_slide_num + len(image_paths))
+
     font_size = int(width * FONT_SIZE_RATIO)
     label_padding = int(font_size * LABEL_PADDING_RATIO)
 
@@ -361,7 +565,8 @@ def create_grid(
         )
 
         # Add label with actual slide number
-        label = f"{start_slide_num + i}"
+        slide_num = slide_numbers[i]
+        label = f"{slide_num}"
         bbox = draw.textbbox((0, 0), label, font=font)
         text_w = bbox[2] - bbox[0]
         draw.text(
@@ -379,13 +584,13 @@ def create_grid(
             orig_w, orig_h = img.size
 
             # Apply placeholder outlines if enabled
-            if placeholder_regions and (start_slide_num + i) in placeholder_regions:
+            if placeholder_regions and slide_num in placeholder_regions:
                 # Convert to RGBA for transparency support
                 if img.mode != "RGBA":
                     img = img.convert("RGBA")
 
                 # Get the regions for this slide
-                regions = placeholder_regions[start_slide_num + i]
+                regions = placeholder_regions[slide_num]
 
                 # Calculate scale factors using actual slide dimensions
                 if slide_dimensions:
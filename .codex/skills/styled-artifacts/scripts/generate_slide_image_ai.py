@@ -2,29 +2,131 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
 import base64
+import email.utils
+import hashlib
+import io
+import json
 import os
+import random
 import re
 import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, BinaryIO, Callable, Optional
 
 try:
     import requests
+    from requests.adapters import HTTPAdapter
 except ImportError:
     print("Error: requests library not found. Install with: pip install requests", file=sys.stderr)
     raise SystemExit(1)
 
 
-def _image_to_data_url(path: Path) -> str:
-    data = path.read_bytes()
-    b64 = base64.b64encode(data).decode("utf-8")
+def _image_mime(path: Path) -> str:
     mime = "image/png"
     if path.suffix.lower() in {".jpg", ".jpeg"}:
         mime = "image/jpeg"
     elif path.suffix.lower() == ".webp":
         mime = "image/webp"
-    return f"data:{mime};base64,{b64}"
+    return mime
+
+
+def _image_to_data_url(path: Path) -> str:
+    data = path.read_bytes()
+    b64 = base64.b64encode(data).decode("utf-8")
+    return f"data:{_image_mime(path)};base64,{b64}"
+
+
+@dataclass(frozen=True)
+class AttachmentOptions:
+    max_edge: Optional[int] = None  # downscale so the longest edge is at most this many pixels
+    format: Optional[str] = None  # re-encode as "jpeg", "webp" or "png" (default: keep the file's format)
+    quality: int = 85  # JPEG/WebP quality
+
+    def is_passthrough(self) -> bool:
+        return self.max_edge is None and self.format is None
+
+
+class AttachmentEncoder:
+    """
+    Turn attachment files into data URLs, optionally downscaled/re-encoded (Pillow) to cut
+    upload size. Results are memoized by file content hash, so the style-anchor image that
+    is attached to many slides is only read, resized and base64-encoded once.
+    """
+
+    FORMATS = ("jpeg", "webp", "png")
+
+    def __init__(self, options: Optional[AttachmentOptions] = None, *, max_cache_bytes: int = 256 * 1024 * 1024):
+        self.options = options or AttachmentOptions()
+        if self.options.format is not None and self.options.format not in self.FORMATS:
+            raise ValueError(f"unsupported attachment format: {self.options.format}")
+        self.max_cache_bytes = max_cache_bytes
+        self._cache: OrderedDict[str, str] = OrderedDict()
+        self._cache_bytes = 0
+        self._lock = threading.Lock()
+
+    def data_url(self, path: Path) -> str:
+        data = path.read_bytes()
+        key = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            url = self._cache.get(key)
+            if url is not None:
+                self._cache.move_to_end(key)
+                return url
+
+        encoded, mime = self._encode(data, _image_mime(path))
+        url = f"data:{mime};base64,{base64.b64encode(encoded).decode('ascii')}"
+
+        with self._lock:
+            if key not in self._cache and len(url) <= self.max_cache_bytes:
+                self._cache[key] = url
+                self._cache_bytes += len(url)
+                while self._cache_bytes > self.max_cache_bytes:
+                    _, old = self._cache.popitem(last=False)
+                    self._cache_bytes -= len(old)
+        return url
+
+    def _encode(self, data: bytes, mime: str) -> tuple[bytes, str]:
+        opts = self.options
+        if opts.is_passthrough():
+            return data, mime
+        try:
+            from PIL import Image
+        except ImportError:
+            return data, mime
+
+        try:
+            with Image.open(io.BytesIO(data)) as img:
+                img.load()
+                resized = False
+                if opts.max_edge and max(img.size) > opts.max_edge:
+                    img.thumbnail((opts.max_edge, opts.max_edge), Image.Resampling.LANCZOS)
+                    resized = True
+                fmt = opts.format or {"image/jpeg": "jpeg", "image/webp": "webp"}.get(mime, "png")
+                if not resized and fmt == mime.split("/")[1]:
+                    return data, mime
+
+                if fmt == "jpeg" and img.mode not in ("RGB", "L"):
+                    rgba = img.convert("RGBA")
+                    img = Image.new("RGB", rgba.size, (255, 255, 255))
+                    img.paste(rgba, mask=rgba.split()[-1])
+                buf = io.BytesIO()
+                if fmt == "png":
+                    img.save(buf, "PNG", optimize=True)
+                else:
+                    img.save(buf, fmt.upper(), quality=opts.quality)
+        except Exception:
+            return data, mime
+
+        out = buf.getvalue()
+        if not resized and len(out) >= len(data):
+            return data, mime  # re-encoding did not help
+        return out, f"image/{fmt}"
 
 
 def _find_data_url(value: Any) -> Optional[str]:
@@ -57,55 +159,470 @@ def _decode_data_url(data_url: str) -> Optional[bytes]:
         return None
 
 
+_STREAM_CHUNK = 64 * 1024
+_JSON_WS_ESCAPE_RE = re.compile(rb"\\[nrt]")
+_NON_BASE64_RE = re.compile(rb"[^A-Za-z0-9+/=]")
+
+
+class _DataUrlStreamDecoder:
+    """
+    Incrementally find the first `"data:image/...;base64,` string in a JSON response body and
+    decode its payload straight into `out`, so the full base64 text (and decoded image) never
+    has to sit in memory. Body text outside the image is kept in `text` for error reporting
+    and as a fallback when no data URL is found.
+    """
+
+    _MARKER = b'"data:image'  # no trailing slash: some encoders emit `\/`
+    _B64 = b";base64,"
+
+    def __init__(self, out: BinaryIO):
+        self.out = out
+        self.state = "scan"  # scan -> header -> body -> done
+        self.pending = b""
+        self.b64_rest = b""
+        self.text = bytearray()
+        self.written = 0
+
+    def feed(self, chunk: bytes) -> None:
+        data = self.pending + chunk
+        self.pending = b""
+        while data:
+            if self.state == "scan":
+                i = data.find(self._MARKER)
+                if i < 0:
+                    keep = len(self._MARKER) - 1
+                    self.text += data[:-keep]
+                    self.pending = data[-keep:]
+                    return
+                self.text += data[:i]
+                data = data[i + len(self._MARKER) :]
+                self.state = "header"
+            elif self.state == "header":
+                j = data.find(self._B64)
+                quote = data.find(b'"')
+                if quote >= 0 and (j < 0 or quote < j):
+                    # An image data URL without base64 payload; keep looking.
+                    data = data[quote:]
+                    self.state = "scan"
+                    continue
+                if j < 0:
+                    self.pending = data
+                    return
+                data = data[j + len(self._B64) :]
+                self.state = "body"
+            elif self.state == "body":
+                end = data.find(b'"')
+                seg = data if end < 0 else data[:end]
+                if end < 0 and seg.endswith(b"\\"):
+                    # Escape sequence split across chunks; finish it with the next chunk.
+                    seg, self.pending = seg[:-1], b"\\"
+                # Payload is plain base64 apart from JSON escapes (`\/`, stray `\n`).
+                seg = _NON_BASE64_RE.sub(b"", _JSON_WS_ESCAPE_RE.sub(b"", seg))
+                seg = self.b64_rest + seg
+                n = len(seg) // 4 * 4
+                if n:
+                    self._write(base64.b64decode(seg[:n]))
+                self.b64_rest = seg[n:]
+                if end < 0:
+                    return
+                if self.b64_rest:
+                    self._write(base64.b64decode(self.b64_rest + b"=" * (-len(self.b64_rest) % 4)))
+                    self.b64_rest = b""
+                self.state = "done"
+                return
+            else:
+                return
+
+    def _write(self, decoded: bytes) -> None:
+        self.out.write(decoded)
+        self.written += len(decoded)
+
+    def finish(self) -> int:
+        """Return the number of image bytes written (0 if no complete data URL was found)."""
+        if self.state != "done":
+            self.text += self.pending
+            self.pending = b""
+            return 0
+        return self.written
+
+
+def _finish_streamed_image(out: BinaryIO, decoder: _DataUrlStreamDecoder) -> int:
+    written = decoder.finish()
+    if written:
+        return written
+    # No data URL in the stream: surface the API error (or decode a non-standard layout).
+    try:
+        data = json.loads(bytes(decoder.text))
+    except ValueError:
+        raise RuntimeError("No image data URL found in response.") from None
+    img = _image_from_response(data)
+    out.write(img)
+    return len(img)
+
+
+class _StreamedImageFile:
+    """Open `<output>.part` for writing; rename it to `output` on success, delete it on error."""
+
+    def __init__(self, output: Path):
+        self.output = Path(output)
+        self.tmp = self.output.with_name(self.output.name + ".part")
+
+    def __enter__(self) -> tuple[BinaryIO, _DataUrlStreamDecoder]:
+        self.f = self.tmp.open("wb")
+        return self.f, _DataUrlStreamDecoder(self.f)
+
+    def __exit__(self, exc_type: Any, *exc: Any) -> None:
+        self.f.close()
+        if exc_type is None:
+            self.tmp.replace(self.output)
+        else:
+            self.tmp.unlink(missing_ok=True)
+
+
+def _retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP-date)."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def _backoff_delay(attempt: int, retry_after: Optional[float], *, base: float, cap: float) -> float:
+    """Exponential backoff with full jitter; an explicit Retry-After wins (capped at `cap`)."""
+    if retry_after is not None:
+        return min(retry_after, cap)
+    return random.uniform(0, min(cap, base * (2 ** (attempt - 1))))
+
+
+def _build_payload(
+    model: str,
+    prompt: str,
+    attachments: list[Path],
+    encoder: Optional[AttachmentEncoder] = None,
+) -> dict[str, Any]:
+    to_url = encoder.data_url if encoder is not None else _image_to_data_url
+    if attachments:
+        content: list[dict[str, Any]] = [{"type": "text", "text": prompt}]
+        for p in attachments:
+            content.append({"type": "image_url", "image_url": {"url": to_url(p)}})
+        message: Any = {"role": "user", "content": content}
+    else:
+        message = {"role": "user", "content": prompt}
+
+    return {
+        "model": model,
+        "messages": [message],
+        "modalities": ["image", "text"],
+    }
+
+
+def _image_from_response(data: dict[str, Any]) -> bytes:
+    if "error" in data:
+        raise RuntimeError(str(data["error"]))
+
+    url = _find_data_url(data)
+    if not url:
+        raise RuntimeError("No image data URL found in response.")
+    img = _decode_data_url(url)
+    if not img:
+        raise RuntimeError("Failed to decode base64 image from response.")
+    return img
+
+
+@dataclass(frozen=True)
+class RequestStats:
+    attempts: int
+    latency_s: float  # wall time across all attempts, including backoff sleeps
+    status: Optional[int]  # final HTTP status (None if every attempt failed to connect)
+
+
 class SlideImageGenerator:
     """
     V2 generator: single-pass image generation (no automated review/regenerate loop).
 
     Review is expected to happen on prompts (content/styled) before artifact generation.
+
+    Requests go through one pooled `requests.Session` (safe to share across threads) and
+    are retried on 429/5xx and connection errors (not read timeouts) with exponential
+    backoff + full jitter, honoring `Retry-After`. Per-request attempts/latency are recorded in `request_stats`.
     """
 
-    def __init__(self, api_key: str, *, verbose: bool = False):
+    RETRY_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+
+    def __init__(
+        self,
+        api_key: str,
+        *,
+        verbose: bool = False,
+        base_url: str = "https://openrouter.ai/api/v1",
+        timeout: float = 300,
+        max_retries: int = 4,
+        backoff_base: float = 2.0,
+        backoff_max: float = 60.0,
+        pool_size: int = 10,
+        attachment_options: Optional[AttachmentOptions] = None,
+    ):
         self.api_key = api_key
         self.verbose = verbose
-        self.base_url = "https://openrouter.ai/api/v1"
+        self.base_url = base_url.rstrip("/")
         self.image_model = "google/gemini-3-pro-image-preview"
+        self.attachments = AttachmentEncoder(attachment_options)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, pool_size))
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"Authorization": f"Bearer {self.api_key}"})
+
+        self.request_stats: list[RequestStats] = []
+        self._stats_lock = threading.Lock()
+
+    def close(self) -> None:
+        self.session.close()
+
+    def _backoff_delay(self, attempt: int, retry_after: Optional[float]) -> float:
+        return _backoff_delay(attempt, retry_after, base=self.backoff_base, cap=self.backoff_max)
+
+    def _record(self, attempts: int, started: float, status: Optional[int]) -> None:
+        with self._stats_lock:
+            self.request_stats.append(RequestStats(attempts, time.monotonic() - started, status))
 
-    def _request(self, payload: dict[str, Any]) -> dict[str, Any]:
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-        }
-        resp = requests.post(f"{self.base_url}/chat/completions", headers=headers, json=payload, timeout=300)
-        if resp.status_code >= 400:
-            raise RuntimeError(f"OpenRouter HTTP {resp.status_code}: {resp.text[:800]}")
-        return resp.json()
+    def _request(self, payload: dict[str, Any], sink: Optional[Callable[[bytes], None]] = None) -> dict[str, Any]:
+        """POST `payload`; return the JSON body, or stream the raw body into `sink` (returns {})."""
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                resp = self.session.post(
+                    f"{self.base_url}/chat/completions",
+                    json=payload,
+                    timeout=self.timeout,
+                    stream=sink is not None,
+                )
+            except requests.ConnectionError as e:
+                # Includes ConnectTimeout. A ReadTimeout is not retried: the server has
+                # already accepted the generation, so a retry could bill the slide twice.
+                if attempt > self.max_retries:
+                    self._record(attempt, started, None)
+                    raise RuntimeError(f"OpenRouter request failed after {attempt} attempt(s): {e}") from e
+                delay = self._backoff_delay(attempt, None)
+                if self.verbose:
+                    print(f"Request error ({e}); retrying in {delay:.1f}s", file=sys.stderr)
+                time.sleep(delay)
+                continue
+            except requests.Timeout as e:
+                self._record(attempt, started, None)
+                raise RuntimeError(f"OpenRouter request timed out (not retried): {e}") from e
+
+            if resp.status_code in self.RETRY_STATUSES and attempt <= self.max_retries:
+                delay = self._backoff_delay(attempt, _retry_after_seconds(resp.headers.get("Retry-After")))
+                if self.verbose:
+                    print(f"OpenRouter HTTP {resp.status_code}; retrying in {delay:.1f}s", file=sys.stderr)
+                resp.close()
+                time.sleep(delay)
+                continue
+
+            try:
+                if resp.status_code >= 400:
+                    raise RuntimeError(f"OpenRouter HTTP {resp.status_code}: {resp.text[:800]}")
+                if sink is None:
+                    return resp.json()
+                for chunk in resp.iter_content(_STREAM_CHUNK):
+                    sink(chunk)
+                return {}
+            finally:
+                resp.close()
+                self._record(attempt, started, resp.status_code)
 
     def generate(self, *, prompt: str, attachments: list[Path]) -> bytes:
-        if attachments:
-            content: list[dict[str, Any]] = [{"type": "text", "text": prompt}]
-            for p in attachments:
-                content.append({"type": "image_url", "image_url": {"url": _image_to_data_url(p)}})
-            message: Any = {"role": "user", "content": content}
-        else:
-            message = {"role": "user", "content": prompt}
+        data = self._request(_build_payload(self.image_model, prompt, attachments, self.attachments))
+        return _image_from_response(data)
+
+    def generate_to_file(self, *, prompt: str, attachments: list[Path], output: Path) -> int:
+        """Like `generate`, but stream-decode the image straight into `output`. Returns bytes written."""
+        payload = _build_payload(self.image_model, prompt, attachments, self.attachments)
+        with _StreamedImageFile(output) as (f, decoder):
+            self._request(payload, decoder.feed)
+            return _finish_streamed_image(f, decoder)
+
+
+class _TokenBucket:
+    """Async token bucket allowing `per_minute` acquisitions per minute, bursting up to `burst`."""
+
+    def __init__(self, per_minute: float, *, burst: int = 1):
+        self.rate = per_minute / 60.0
+        self.capacity = float(max(1, burst))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class AsyncSlideImageGenerator:
+    """
+    Asyncio variant of `SlideImageGenerator` built on aiohttp.
+
+    At most `max_concurrency` requests are in flight at once and, if `requests_per_minute`
+    is set, attempts (including retries) are spaced by a token bucket. Retry/backoff and
+    response handling match the sync generator. Use as an async context manager:
+
+        async with AsyncSlideImageGenerator(key, max_concurrency=8) as gen:
+            img = await gen.generate(prompt=..., attachments=[...])
+    """
+
+    RETRY_STATUSES = SlideImageGenerator.RETRY_STATUSES
+
+    def __init__(
+        self,
+        api_key: str,
+        *,
+        verbose: bool = False,
+        base_url: str = "https://openrouter.ai/api/v1",
+        timeout: float = 300,
+        max_retries: int = 4,
+        backoff_base: float = 2.0,
+        backoff_max: float = 60.0,
+        max_concurrency: int = 8,
+        requests_per_minute: Optional[float] = None,
+        attachment_options: Optional[AttachmentOptions] = None,
+    ):
+        try:
+            import aiohttp
+        except ImportError:
+            raise RuntimeError("aiohttp library not found. Install with: pip install aiohttp") from None
+
+        self._aiohttp = aiohttp
+        self.api_key = api_key
+        self.verbose = verbose
+        self.base_url = base_url.rstrip("/")
+        self.image_model = "google/gemini-3-pro-image-preview"
+        self.attachments = AttachmentEncoder(attachment_options)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_concurrency = max(1, max_concurrency)
+
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._bucket = _TokenBucket(requests_per_minute) if requests_per_minute else None
+        self._session: Any = None
+
+        self.request_stats: list[RequestStats] = []
+
+    async def __aenter__(self) -> "AsyncSlideImageGenerator":
+        aiohttp = self._aiohttp
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.max_concurrency),
+            headers={"Authorization": f"Bearer {self.api_key}"},
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _request(self, payload: dict[str, Any], sink: Optional[Callable[[bytes], None]] = None) -> dict[str, Any]:
+        if self._session is None:
+            raise RuntimeError("AsyncSlideImageGenerator must be used as an async context manager")
+        aiohttp = self._aiohttp
+        started = time.monotonic()
+        attempt = 0
+        streamed = False  # once `sink` has body bytes, a retry would feed it a second response
+        async with self._semaphore:
+            while True:
+                attempt += 1
+                status = None
+                if self._bucket is not None:
+                    await self._bucket.acquire()
+                try:
+                    async with self._session.post(f"{self.base_url}/chat/completions", json=payload) as resp:
+                        status = resp.status
+                        retry_after = _retry_after_seconds(resp.headers.get("Retry-After"))
+                        if not (status in self.RETRY_STATUSES and attempt <= self.max_retries):
+                            try:
+                                if status >= 400:
+                                    text = await resp.text()
+                                    raise RuntimeError(f"OpenRouter HTTP {status}: {text[:800]}")
+                                if sink is None:
+                                    return await resp.json(content_type=None)
+                                async for chunk in resp.content.iter_chunked(_STREAM_CHUNK):
+                                    streamed = True
+                                    sink(chunk)
+                                return {}
+                            finally:
+                                self.request_stats.append(RequestStats(attempt, time.monotonic() - started, status))
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    if streamed:  # stats already recorded by the `finally` above
+                        raise RuntimeError(f"OpenRouter response interrupted while streaming: {e!r}") from e
+                    if isinstance(e, asyncio.TimeoutError) and not isinstance(
+                        e, getattr(aiohttp, "ConnectionTimeoutError", ())
+                    ):
+                        # Like the sync path, only connect timeouts are retried: past that the
+                        # server has accepted the generation and a retry could bill it twice.
+                        if status is None:  # otherwise recorded by the `finally` above
+                            self.request_stats.append(RequestStats(attempt, time.monotonic() - started, None))
+                        raise RuntimeError(f"OpenRouter request timed out (not retried): {e!r}") from e
+                    if attempt > self.max_retries:
+                        self.request_stats.append(RequestStats(attempt, time.monotonic() - started, None))
+                        raise RuntimeError(f"OpenRouter request failed after {attempt} attempt(s): {e!r}") from e
+                    status, retry_after = None, None
+
+                delay = _backoff_delay(attempt, retry_after, base=self.backoff_base, cap=self.backoff_max)
+                if self.verbose:
+                    reason = f"HTTP {status}" if status else "request error"
+                    print(f"OpenRouter {reason}; retrying in {delay:.1f}s", file=sys.stderr)
+                await asyncio.sleep(delay)
+
+    async def generate(self, *, prompt: str, attachments: list[Path]) -> bytes:
+        # Base64-encoding attachments is CPU work; keep it off the event loop.
+        payload = await asyncio.to_thread(_build_payload, self.image_model, prompt, attachments, self.attachments)
+        data = await self._request(payload)
+        return _image_from_response(data)
+
+    async def generate_to_file(self, *, prompt: str, attachments: list[Path], output: Path) -> int:
+        """Like `generate`, but stream-decode the image straight into `output`. Returns bytes written."""
+        payload = await asyncio.to_thread(_build_payload, self.image_model, prompt, attachments, self.attachments)
+        with _StreamedImageFile(output) as (f, decoder):
+            await self._request(payload, decoder.feed)
+            return _finish_streamed_image(f, decoder)
+
 
-        payload: dict[str, Any] = {
-            "model": self.image_model,
-            "messages": [message],
-            "modalities": ["image", "text"],
-        }
-        data = self._request(payload)
+def add_attachment_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--attach-max-edge", type=int, help="Downscale attachments so their longest edge is at most N px")
+    parser.add_argument("--attach-format", choices=AttachmentEncoder.FORMATS, help="Re-encode attachments as this format before upload")
+    parser.add_argument("--attach-quality", type=int, default=85, help="JPEG/WebP quality for re-encoded attachments (default: 85)")
 
-        if "error" in data:
-            raise RuntimeError(str(data["error"]))
 
-        url = _find_data_url(data)
-        if not url:
-            raise RuntimeError("No image data URL found in response.")
-        img = _decode_data_url(url)
-        if not img:
-            raise RuntimeError("Failed to decode base64 image from response.")
-        return img
+def attachment_options_from_args(args: argparse.Namespace) -> AttachmentOptions:
+    return AttachmentOptions(max_edge=args.attach_max_edge, format=args.attach_format, quality=args.attach_quality)
 
 
 def main(argv: Optional[list[str]] = None) -> int:
@@ -114,6 +631,8 @@ def main(argv: Optional[list[str]] = None) -> int:
     parser.add_argument("-o", "--output", required=True, help="Output image path")
     parser.add_argument("--attach", action="append", dest="attachments", metavar="FILE", help="Attach image file(s)")
     parser.add_argument("--api-key", help="OpenRouter API key (or set OPENROUTER_API_KEY)")
+    parser.add_argument("--max-retries", type=int, default=4, help="Retries on 429/5xx/connection errors (default: 4)")
+    add_attachment_arguments(parser)
     parser.add_argument("-v", "--verbose", action="store_true")
     args = parser.parse_args(argv)
 
@@ -134,11 +653,17 @@ def main(argv: Optional[list[str]] = None) -> int:
                 return 2
             attachments.append(p)
 
-    gen = SlideImageGenerator(api_key=api_key, verbose=bool(args.verbose))
-    img = gen.generate(prompt=args.prompt, attachments=attachments)
-    output_path.write_bytes(img)
+    gen = SlideImageGenerator(
+        api_key=api_key,
+        verbose=bool(args.verbose),
+        max_retries=args.max_retries,
+        attachment_options=attachment_options_from_args(args),
+    )
+    gen.generate_to_file(prompt=args.prompt, attachments=attachments, output=output_path)
     if args.verbose:
         print(f"Wrote {output_path} ({output_path.stat().st_size} bytes)")
+        for st in gen.request_stats:
+            print(f"Request: {st.attempts} attempt(s), {st.latency_s:.1f}s, HTTP {st.status}")
     return 0
 
 
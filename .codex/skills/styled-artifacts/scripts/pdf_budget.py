@@ -0,0 +1,155 @@
+"""
+Fit an image-per-page PDF under a total byte budget.
+
+The budget is split across pages in proportion to each source image's file size
+(a cheap proxy for how much detail a page carries), with a floor so simple pages
+are not starved. Each page is then
+re-encoded as JPEG at the highest quality that fits its share, found by binary
+search; if even the lowest quality does not fit, the page is downscaled step by
+step and searched again. Bytes left unused by pages that compressed well are
+then handed to the pages that had to give up quality or resolution, and those
+are searched once more. Pages are processed in parallel and written to a scratch
+dir for `StreamingPDFWriter`.
+"""
+
+from __future__ import annotations
+
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from PIL import Image
+
+
+# Every page gets at least this fraction of an equal share of the budget.
+_MIN_SHARE = 0.25
+# Rough PDF bytes per page besides the image stream (page, content and xref entries).
+PAGE_OVERHEAD = 1024
+MIN_QUALITY = 30
+MAX_QUALITY = 95
+_SCALE_STEP = 0.8
+_MIN_SCALE = 0.25
+
+
+@dataclass(frozen=True)
+class BudgetedPage:
+    source: Path
+    path: Path
+    quality: Optional[int]  # None: source embedded unchanged
+    width: int
+    height: int
+    source_width: int
+    nbytes: int
+    fits: bool
+
+
+def _encode_jpeg(img: Image.Image, quality: int) -> bytes:
+    buf = io.BytesIO()
+    img.save(buf, "JPEG", quality=quality, optimize=True)
+    return buf.getvalue()
+
+
+def _best_quality(img: Image.Image, budget: int) -> Optional[tuple[int, bytes]]:
+    """Highest JPEG quality in [MIN_QUALITY, MAX_QUALITY] whose output fits `budget`."""
+    lo, hi = MIN_QUALITY, MAX_QUALITY
+    best: Optional[tuple[int, bytes]] = None
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        data = _encode_jpeg(img, mid)
+        if len(data) <= budget:
+            best = (mid, data)
+            lo = mid + 1
+        else:
+            hi = mid - 1
+    return best
+
+
+def _fit_page(source: Path, out: Path, budget: int) -> BudgetedPage:
+    with Image.open(source) as img:
+        if img.mode in ("RGBA", "LA", "P", "PA") or "transparency" in img.info:
+            rgba = img.convert("RGBA")
+            full = Image.new("RGB", rgba.size, (255, 255, 255))
+            full.paste(rgba, mask=rgba.split()[-1])
+        elif img.mode not in ("RGB", "L"):
+            full = img.convert("RGB")
+        else:
+            full = img.copy()
+
+    scale = 1.0
+    while True:
+        if scale == 1.0:
+            page = full
+        else:
+            size = (max(1, round(full.width * scale)), max(1, round(full.height * scale)))
+            page = full.resize(size, Image.Resampling.LANCZOS)
+        best = _best_quality(page, budget)
+        fits = best is not None
+        if best is None and scale * _SCALE_STEP < _MIN_SCALE:
+            best = (MIN_QUALITY, _encode_jpeg(page, MIN_QUALITY))  # as small as we go; report it
+        if best is not None:
+            quality, data = best
+            out.write_bytes(data)
+            return BudgetedPage(source, out, quality, page.width, page.height, full.width, len(data), fits)
+        scale *= _SCALE_STEP
+
+
+def fit_pages_to_budget(
+    image_paths: list[Path],
+    max_bytes: int,
+    scratch_dir: Path,
+    *,
+    jobs: Optional[int] = None,
+) -> list[BudgetedPage]:
+    """
+    Return one page per image whose total (plus PDF overhead) aims to stay within `max_bytes`.
+    If the images already fit as-is they are returned unchanged (quality None).
+    """
+    paths = [Path(p) for p in image_paths]
+    sizes = [p.stat().st_size for p in paths]
+    available = max_bytes - PAGE_OVERHEAD * (len(paths) + 1)
+
+    if sum(sizes) <= available:
+        pages = []
+        for p, n in zip(paths, sizes):
+            with Image.open(p) as img:
+                w, h = img.size
+            pages.append(BudgetedPage(p, p, None, w, h, w, n, True))
+        return pages
+
+    scratch_dir.mkdir(parents=True, exist_ok=True)
+    floor = available / len(paths) * _MIN_SHARE
+    weights = [max(float(n), floor) for n in sizes]
+    budgets = [max(1, int(available * w / sum(weights))) for w in weights]
+    outs = [scratch_dir / f"{i:03d}_{p.stem}.jpg" for i, p in enumerate(paths, start=1)]
+
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(paths) or 1))
+    with ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else _Inline() as pool:
+        pages = list(pool.map(_fit_page, paths, outs, budgets))
+
+        # Second pass: give slack from pages that came in under budget to pages that were
+        # compressed below the top quality or downscaled.
+        retry = [i for i, p in enumerate(pages) if p.quality != MAX_QUALITY or p.width != p.source_width]
+        slack = available - sum(budgets[i] if i in retry else p.nbytes for i, p in enumerate(pages))
+        if slack > 0 and retry:
+            extra = sum(budgets[i] for i in retry)
+            new_budgets = [budgets[i] + int(slack * budgets[i] / extra) for i in retry]
+            redone = pool.map(_fit_page, [paths[i] for i in retry], [outs[i] for i in retry], new_budgets)
+            for i, page in zip(retry, redone):
+                pages[i] = page
+    return pages
+
+
+class _Inline:
+    """Stand-in for a process pool when running with a single job."""
+
+    def __enter__(self) -> "_Inline":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        return None
+
+    def map(self, fn, *iterables):
+        return list(map(fn, *iterables))
@@ -0,0 +1,268 @@
+"""
+Constant-memory PDF writer for image-per-page documents.
+
+Pages are written one at a time straight to the output file; only the xref
+offsets are kept in memory. Image data is embedded without re-decoding when the
+source is already in a form PDF can carry as-is:
+
+  - baseline/progressive JPEG (RGB or grayscale) -> DCTDecode, bytes copied verbatim
+  - non-interlaced 8-bit RGB/grayscale PNG -> FlateDecode with PNG predictors,
+    IDAT payload copied verbatim
+
+Anything else (alpha, palette, 16-bit, WebP/GIF/BMP, CMYK) is decoded once,
+flattened onto white and re-encoded as a lossless PNG stream, one page at a time.
+"""
+
+from __future__ import annotations
+
+import io
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Optional, Union
+
+from PIL import Image
+
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+_COPY_CHUNK = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class _ImageStream:
+    """An image XObject body: PDF dictionary entries plus where to copy the stream from."""
+
+    width: int
+    height: int
+    colorspace: str
+    filter: str
+    length: int
+    decode_parms: Optional[str] = None
+    # Byte ranges (offset, length) in `source` that concatenate to the stream data.
+    ranges: tuple[tuple[int, int], ...] = ()
+    source: Union[Path, bytes, None] = None
+
+
+def _flatten_to_png(img: Image.Image) -> bytes:
+    if img.mode in ("RGBA", "LA", "P", "PA") or (img.mode in ("RGB", "L") and "transparency" in img.info):
+        rgba = img.convert("RGBA")
+        flat = Image.new("RGB", rgba.size, (255, 255, 255))
+        flat.paste(rgba, mask=rgba.split()[-1])
+        img = flat
+    elif img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+    buf = io.BytesIO()
+    img.save(buf, "PNG", compress_level=6)
+    return buf.getvalue()
+
+
+def _png_stream(f: BinaryIO, source: Union[Path, bytes]) -> Optional[_ImageStream]:
+    """Describe a PNG whose IDAT data PDF can use directly, or None if it needs re-encoding."""
+    f.seek(0)
+    if f.read(8) != _PNG_SIGNATURE:
+        return None
+    header = f.read(8)
+    if len(header) < 8 or header[4:] != b"IHDR":
+        return None
+    ihdr = f.read(13)
+    f.seek(4, io.SEEK_CUR)  # CRC
+    width, height, depth, color_type, _, _, interlace = struct.unpack(">IIBBBBB", ihdr)
+    if depth != 8 or interlace != 0 or color_type not in (0, 2):
+        return None
+
+    ranges: list[tuple[int, int]] = []
+    while True:
+        head = f.read(8)
+        if len(head) < 8:
+            return None
+        length, ctype = struct.unpack(">I4s", head)
+        if ctype == b"tRNS":
+            return None  # transparency needs flattening
+        if ctype == b"IDAT":
+            ranges.append((f.tell(), length))
+        if ctype == b"IEND":
+            break
+        f.seek(length + 4, io.SEEK_CUR)
+    if not ranges:
+        return None
+
+    colors = 3 if color_type == 2 else 1
+    return _ImageStream(
+        width=width,
+        height=height,
+        colorspace="/DeviceRGB" if colors == 3 else "/DeviceGray",
+        filter="/FlateDecode",
+        length=sum(n for _, n in ranges),
+        decode_parms=f"<< /Predictor 15 /Colors {colors} /BitsPerComponent 8 /Columns {width} >>",
+        ranges=tuple(ranges),
+        source=source,
+    )
+
+
+def _image_stream(source: Union[Path, bytes]) -> _ImageStream:
+    """Describe `source` (a file or in-memory JPEG/PNG bytes) as an image XObject stream."""
+    if isinstance(source, bytes):
+        f: BinaryIO = io.BytesIO(source)
+        size = len(source)
+    else:
+        f = source.open("rb")
+        size = source.stat().st_size
+    with f:
+        stream = _png_stream(f, source)
+        if stream is not None:
+            return stream
+        f.seek(0)
+        with Image.open(f) as img:
+            # Image.open only parses the header; pixels are decoded below only if needed.
+            if img.format == "JPEG" and img.mode in ("RGB", "L"):
+                return _ImageStream(
+                    width=img.width,
+                    height=img.height,
+                    colorspace="/DeviceRGB" if img.mode == "RGB" else "/DeviceGray",
+                    filter="/DCTDecode",
+                    length=size,
+                    ranges=((0, size),),
+                    source=source,
+                )
+            data = _flatten_to_png(img)
+    stream = _png_stream(io.BytesIO(data), data)
+    assert stream is not None  # _flatten_to_png always emits 8-bit RGB/L, non-interlaced
+    return stream
+
+
+class StreamingPDFWriter:
+    """
+    Write an image-per-page PDF incrementally.
+
+        with StreamingPDFWriter(out_path) as pdf:
+            for p in images:
+                pdf.add_image_page(p, dpi=150)
+
+    Page size follows the image size at `dpi` (same as Pillow's PDF `resolution`).
+    """
+
+    def __init__(self, output_path: Path):
+        self.output_path = Path(output_path)
+        self._f: Optional[BinaryIO] = None
+        self._offsets: dict[int, int] = {}
+        self._next_obj = 3  # 1 = catalog, 2 = page tree (written on close)
+        self._pages: list[int] = []
+
+    def __enter__(self) -> "StreamingPDFWriter":
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    @property
+    def page_count(self) -> int:
+        return len(self._pages)
+
+    def open(self) -> None:
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        self._f = self.output_path.open("wb")
+        self._f.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self._begin(1)
+        self._f.write(b"<< /Type /Catalog /Pages 2 0 R >>\nendobj\n")
+
+    def _alloc(self) -> int:
+        n = self._next_obj
+        self._next_obj += 1
+        return n
+
+    def _begin(self, num: int) -> None:
+        assert self._f is not None
+        self._offsets[num] = self._f.tell()
+        self._f.write(f"{num} 0 obj\n".encode("ascii"))
+
+    def add_image_page(self, image_path: Path, *, dpi: float = 150) -> tuple[int, int]:
+        """Append one page showing `image_path` full-bleed. Returns the image size in pixels."""
+        return self._add_stream_page(_image_stream(Path(image_path)), dpi)
+
+    def add_encoded_page(self, data: bytes, *, dpi: float = 150) -> tuple[int, int]:
+        """Append a page from an in-memory JPEG/PNG (e.g. one re-encoded to a byte budget)."""
+        return self._add_stream_page(_image_stream(data), dpi)
+
+    def _add_stream_page(self, stream: _ImageStream, dpi: float) -> tuple[int, int]:
+        f = self._f
+        if f is None:
+            raise RuntimeError("writer is not open")
+
+        image_obj, content_obj, page_obj = self._alloc(), self._alloc(), self._alloc()
+        w_pt = stream.width * 72.0 / dpi
+        h_pt = stream.height * 72.0 / dpi
+
+        self._begin(image_obj)
+        parms = f" /DecodeParms {stream.decode_parms}" if stream.decode_parms else ""
+        f.write(
+            (
+                f"<< /Type /XObject /Subtype /Image /Width {stream.width} /Height {stream.height}"
+                f" /ColorSpace {stream.colorspace} /BitsPerComponent 8 /Filter {stream.filter}{parms}"
+                f" /Length {stream.length} >>\nstream\n"
+            ).encode("ascii")
+        )
+        self._copy_ranges(stream)
+        f.write(b"\nendstream\nendobj\n")
+
+        content = f"q {w_pt:.4f} 0 0 {h_pt:.4f} 0 0 cm /Im0 Do Q".encode("ascii")
+        self._begin(content_obj)
+        f.write(f"<< /Length {len(content)} >>\nstream\n".encode("ascii") + content + b"\nendstream\nendobj\n")
+
+        self._begin(page_obj)
+        f.write(
+            (
+                f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {w_pt:.4f} {h_pt:.4f}]"
+                f" /Resources << /XObject << /Im0 {image_obj} 0 R >> >> /Contents {content_obj} 0 R >>\nendobj\n"
+            ).encode("ascii")
+        )
+        self._pages.append(page_obj)
+        return stream.width, stream.height
+
+    def _copy_ranges(self, stream: _ImageStream) -> None:
+        assert self._f is not None
+        if isinstance(stream.source, bytes):
+            view = memoryview(stream.source)
+            for off, n in stream.ranges:
+                self._f.write(view[off : off + n])
+            return
+        with Path(stream.source).open("rb") as src:
+            for off, n in stream.ranges:
+                src.seek(off)
+                remaining = n
+                while remaining:
+                    buf = src.read(min(_COPY_CHUNK, remaining))
+                    if not buf:
+                        raise ValueError(f"truncated image data in {stream.source}")
+                    self._f.write(buf)
+                    remaining -= len(buf)
+
+    def close(self) -> None:
+        f = self._f
+        if f is None:
+            return
+        if not self._pages:
+            self.abort()
+            raise ValueError("PDF has no pages")
+        self._begin(2)
+        kids = " ".join(f"{n} 0 R" for n in self._pages)
+        f.write(f"<< /Type /Pages /Kids [{kids}] /Count {len(self._pages)} >>\nendobj\n".encode("ascii"))
+
+        xref_at = f.tell()
+        size = self._next_obj
+        f.write(f"xref\n0 {size}\n0000000000 65535 f \n".encode("ascii"))
+        for num in range(1, size):
+            f.write(f"{self._offsets[num]:010d} 00000 n \n".encode("ascii"))
+        f.write(f"trailer\n<< /Size {size} /Root 1 0 R >>\nstartxref\n{xref_at}\n%%EOF\n".encode("ascii"))
+        f.close()
+        self._f = None
+
+    def abort(self) -> None:
+        """Close and delete a partially written file."""
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+        self.output_path.unlink(missing_ok=True)
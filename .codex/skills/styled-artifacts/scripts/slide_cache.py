@@ -0,0 +1,92 @@
+"""
+Content-addressed on-disk cache for generated slide images.
+
+Entries are keyed by a hash of everything that determines the model output
+(prompt text, model id, attachment bytes), so an unchanged slide is served from
+disk instead of paying for another API call. The cache is bounded by total size
+and evicts least-recently-used entries (mtime is refreshed on every hit).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Iterable, Optional
+
+
+DEFAULT_MAX_MB = 2048
+
+
+def file_sha256(path: Path) -> str:
+    with path.open("rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+class SlideImageCache:
+    def __init__(self, root: Path, *, max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def key(prompt: str, model: str, attachments: Iterable[Path], *, extra: str = "") -> str:
+        """`extra` covers anything else that changes the request (e.g. attachment preprocessing)."""
+        h = hashlib.sha256()
+        h.update(b"model\0" + model.encode("utf-8") + b"\0")
+        if extra:
+            h.update(b"extra\0" + extra.encode("utf-8") + b"\0")
+        h.update(b"prompt\0" + prompt.encode("utf-8") + b"\0")
+        for a in attachments:
+            # Order matters: the anchor image is always attached first.
+            h.update(b"attachment\0" + file_sha256(a).encode("ascii") + b"\0")
+        return h.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.png"
+
+    def get(self, key: str) -> Optional[Path]:
+        path = self._path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put_file(self, key: str, src: Path) -> Path:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write-then-rename so concurrent workers never observe a partial entry.
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f, Path(src).open("rb") as s:
+                shutil.copyfileobj(s, f)
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        return path
+
+    def evict(self) -> int:
+        """Delete least-recently-used entries until the cache fits `max_bytes`. Returns entries removed."""
+        if not self.root.exists():
+            return 0
+        entries: list[tuple[float, int, Path]] = []
+        total = 0
+        for p in self.root.glob("*/*.png"):
+            try:
+                st = p.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+            total += st.st_size
+
+        removed = 0
+        for _, size, p in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            p.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        return removed
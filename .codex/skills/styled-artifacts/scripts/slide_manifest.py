@@ -0,0 +1,120 @@
+"""
+Per-slide build manifest for incremental deck rebuilds.
+
+The manifest (`<workdir>/manifest.json`) records, for every generated slide, the
+hashes of its inputs (prompt, attachments, style anchor image), the model and
+attachment options it was generated with, and where its image was written. `changed_slides` diffs the current deck against it to find the
+slides that need regenerating.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from slide_cache import file_sha256
+
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 2
+
+
+@dataclass(frozen=True)
+class SlideRecord:
+    index: int
+    slug: str
+    prompt_sha256: str
+    attachments: list[str] = field(default_factory=list)  # sha256 per attachment, in order
+    anchor: Optional[int] = None
+    anchor_sha256: Optional[str] = None  # hash of the anchor image this slide was generated from
+    model: str = ""
+    attachment_options: str = ""  # repr(AttachmentOptions), as in the slide cache key
+    output: str = ""  # relative to the workdir
+    generated_at: str = ""
+
+    def same_inputs(self, other: "SlideRecord") -> bool:
+        return (
+            self.slug,
+            self.prompt_sha256,
+            self.attachments,
+            self.anchor,
+            self.model,
+            self.attachment_options,
+        ) == (
+            other.slug,
+            other.prompt_sha256,
+            other.attachments,
+            other.anchor,
+            other.model,
+            other.attachment_options,
+        )
+
+
+def load_manifest(workdir: Path) -> dict[int, SlideRecord]:
+    path = workdir / MANIFEST_NAME
+    if not path.exists():
+        return {}
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != MANIFEST_VERSION:
+        return {}
+    records: dict[int, SlideRecord] = {}
+    for raw in data.get("slides", []):
+        try:
+            rec = SlideRecord(**raw)
+        except TypeError:
+            continue
+        records[rec.index] = rec
+    return records
+
+
+def save_manifest(workdir: Path, records: dict[int, SlideRecord]) -> Path:
+    path = workdir / MANIFEST_NAME
+    data = {
+        "version": MANIFEST_VERSION,
+        "slides": [asdict(records[i]) for i in sorted(records)],
+    }
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(data, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    tmp.replace(path)
+    return path
+
+
+def changed_slides(
+    current: dict[int, SlideRecord],
+    previous: dict[int, SlideRecord],
+    workdir: Path,
+) -> set[int]:
+    """
+    Return the slide indices in `current` that must be regenerated:
+      - new slides, or slides whose slug/prompt/attachments/anchor/model/attachment options changed
+      - slides whose image is missing from the workdir
+      - slides whose anchor image differs from the one they were generated from
+      - slides anchored (transitively) on any of the above
+    `current` records only need the input fields (output path, no timestamps).
+    """
+    dirty: set[int] = set()
+    for idx, rec in current.items():
+        old = previous.get(idx)
+        if old is None or not old.same_inputs(rec) or not (workdir / rec.output).exists():
+            dirty.add(idx)
+            continue
+        if rec.anchor is not None and rec.anchor in current:
+            anchor_path = workdir / current[rec.anchor].output
+            anchor_sha = file_sha256(anchor_path) if anchor_path.exists() else None
+            if anchor_sha != old.anchor_sha256:
+                dirty.add(idx)
+
+    # Propagate through the anchor graph: a slide is dirty if its anchor will be regenerated.
+    grew = True
+    while grew:
+        grew = False
+        for idx, rec in current.items():
+            if idx not in dirty and rec.anchor in dirty:
+                dirty.add(idx)
+                grew = True
+    return dirty
@@ -14,12 +14,23 @@ Usage:
     
     # From a directory (sorted by filename)
     python slides_to_pdf.py slides/ -o presentation.pdf
+
+Pages are written one at a time (see pdf_stream.py), so memory use does not grow
+with the number of slides; pass --writer pillow for the previous all-in-memory
+Pillow writer.
+
+With --target-dpi/--image-format/--quality/--scratch-dir, images are first
+normalized in parallel (flatten, downsample, recompress) by the pptx skill's
+normalize_images.py. --jobs only sets the worker count, for that stage and for
+the --max-size search.
 """
 
 import argparse
 import sys
+import tempfile
+from dataclasses import replace
 from pathlib import Path
-from typing import List
+from typing import TYPE_CHECKING, List, Optional, Tuple
 
 try:
     from PIL import Image
@@ -27,6 +38,29 @@ except ImportError:
     print("Error: Pillow library not found. Install with: pip install Pillow")
     sys.exit(1)
 
+from pdf_budget import BudgetedPage, fit_pages_to_budget
+from pdf_stream import StreamingPDFWriter
+
+# The normalization stage is shared with the pptx skill's images_to_pptx.py and only
+# imported when it is used, so a plain export works without the pptx skill.
+_PPTX_SCRIPTS = Path(__file__).resolve().parents[2] / "pptx" / "scripts"
+
+if TYPE_CHECKING:
+    from normalize_images import NormalizeOptions
+
+
+def _import_normalize_images():
+    """The pptx skill's normalize_images module, or None (with an error printed) if it is missing."""
+    if str(_PPTX_SCRIPTS) not in sys.path:
+        sys.path.append(str(_PPTX_SCRIPTS))
+    try:
+        import normalize_images
+    except ImportError as e:
+        print(f"Error: image normalization needs {_PPTX_SCRIPTS / 'normalize_images.py'} "
+              f"from the pptx skill ({e})")
+        return None
+    return normalize_images
+
 
 def get_image_files(paths: List[str]) -> List[Path]:
     """
@@ -36,7 +70,8 @@ def get_image_files(paths: List[str]) -> List[Path]:
         paths: List of file paths or directory paths
         
     Returns:
-        Sorted list of image file paths
+        Image file paths in argument order (directories and globs sorted by name),
+        without duplicates
     """
     image_extensions = {'.png', '.jpg', '.jpeg', '.gif', '.webp', '.bmp'}
     image_files = []
@@ -51,28 +86,42 @@ def get_image_files(paths: List[str]) -> List[Path]:
                 print(f"Warning: Skipping non-image file: {path}")
         elif path.is_dir():
             # Get all images in directory
+            found = []
             for ext in image_extensions:
-                image_files.extend(path.glob(f"*{ext}"))
-                image_files.extend(path.glob(f"*{ext.upper()}"))
+                found.extend(path.glob(f"*{ext}"))
+                found.extend(path.glob(f"*{ext.upper()}"))
+            image_files.extend(sorted(found, key=lambda x: x.name))
         else:
             # Try glob pattern
             parent = path.parent
             pattern = path.name
             if parent.exists():
-                matches = list(parent.glob(pattern))
+                matches = sorted(parent.glob(pattern), key=lambda x: x.name)
                 for match in matches:
                     if match.suffix.lower() in image_extensions:
                         image_files.append(match)
     
-    # Remove duplicates and sort
-    image_files = list(set(image_files))
-    image_files.sort(key=lambda x: x.name)
-    
-    return image_files
+    # Remove duplicates; explicit files keep their order (slide_10 must not sort before slide_2)
+    return list(dict.fromkeys(image_files))
+
+
+def _print_summary(output_path: Path, page_count: int) -> None:
+    print(f"\n✓ PDF created: {output_path}")
+    print(f"  Total slides: {page_count}")
+    file_size = output_path.stat().st_size
+    if file_size > 1024 * 1024:
+        print(f"  File size: {file_size / (1024 * 1024):.1f} MB")
+    else:
+        print(f"  File size: {file_size / 1024:.1f} KB")
 
 
 def combine_images_to_pdf(image_paths: List[Path], output_path: Path, 
-                         dpi: int = 150, verbose: bool = False) -> bool:
+                         dpi: int = 150, verbose: bool = False,
+                         writer: str = "stream",
+                         normalize: Optional["NormalizeOptions"] = None,
+                         jobs: Optional[int] = None,
+                         scratch_dir: Optional[Path] = None,
+                         max_size_mb: Optional[float] = None) -> bool:
     """
     Combine multiple images into a single PDF.
     
@@ -81,6 +130,12 @@ def combine_images_to_pdf(image_paths: List[Path], output_path: Path,
         output_path: Output PDF path
         dpi: Resolution for the PDF (default: 150)
         verbose: Print progress information
+        writer: "stream" (one page at a time, JPEG/PNG data embedded as-is)
+                or "pillow" (all pages decoded in memory, then saved by Pillow)
+        normalize: If set, normalize images first (see normalize_images.py)
+                   using `jobs` processes, into `scratch_dir` (default: a temp dir)
+        max_size_mb: If set, re-encode pages as JPEG (per-page quality/resolution
+                     search, `jobs` processes) so the PDF fits this size
         
     Returns:
         True if successful, False otherwise
@@ -92,6 +147,67 @@ def combine_images_to_pdf(image_paths: List[Path], output_path: Path,
     if verbose:
         print(f"Combining {len(image_paths)} images into PDF...")
     
+    if writer != "stream" and (max_size_mb is not None or
+                               (normalize is not None and normalize.target_dpi is not None)):
+        print("Error: --max-size and --target-dpi require the stream writer")
+        return False
+    
+    if normalize is None and max_size_mb is None:
+        if writer == "stream":
+            return _combine_streaming([(p, dpi) for p in image_paths], output_path, verbose=verbose)
+        return _combine_pillow(image_paths, output_path, dpi, verbose)
+    
+    with tempfile.TemporaryDirectory(prefix="slides_to_pdf-") as tmp:
+        pages = [(Path(p), float(dpi)) for p in image_paths]
+        
+        if normalize is not None:
+            normalize_images = _import_normalize_images()
+            if normalize_images is None:
+                return False
+            scratch = Path(scratch_dir) if scratch_dir else Path(tmp) / "normalized"
+            try:
+                normalized = normalize_images.normalize_images(image_paths, scratch, replace(normalize, page_in=None, source_dpi=dpi), jobs=jobs)
+            except Exception as e:
+                print(f"Error normalizing images: {e}")
+                return False
+            if verbose:
+                print(f"Normalized {len(normalized)} image(s) into {scratch}")
+            if writer != "stream":
+                return _combine_pillow([n.path for n in normalized], output_path, dpi, verbose)
+            # Downsampled pages keep their printed size: scale the page DPI with the pixels.
+            pages = [(n.path, dpi * n.width / n.source_width) for n in normalized]
+        
+        if max_size_mb is not None:
+            max_bytes = int(max_size_mb * 1024 * 1024)
+            try:
+                budgeted = fit_pages_to_budget([p for p, _ in pages], max_bytes, Path(tmp) / "budget", jobs=jobs)
+            except Exception as e:
+                print(f"Error compressing pages: {e}")
+                return False
+            pages = [(b.path, page_dpi * b.width / b.source_width) for b, (_, page_dpi) in zip(budgeted, pages)]
+        
+        if not _combine_streaming(pages, output_path, verbose=verbose):
+            return False
+    
+    if max_size_mb is not None:
+        _print_budget_report(budgeted, output_path, max_bytes)
+    return True
+
+
+def _print_budget_report(pages: List[BudgetedPage], output_path: Path, max_bytes: int) -> None:
+    total = output_path.stat().st_size
+    print(f"PDF size: {total / (1024 * 1024):.2f} MB (budget {max_bytes / (1024 * 1024):.2f} MB)")
+    for i, page in enumerate(pages, start=1):
+        how = "unchanged" if page.quality is None else f"JPEG q{page.quality}"
+        note = "" if page.fits else "  (over page budget at minimum quality/size)"
+        print(f"  page {i:3d}: {page.nbytes / 1024:8.1f} KB  {page.width}x{page.height}  {how}{note}")
+    if total > max_bytes:
+        print(f"Warning: could not fit the PDF within {max_bytes / (1024 * 1024):.2f} MB")
+
+
+def _combine_pillow(image_paths: List[Path], output_path: Path,
+                    dpi: int, verbose: bool) -> bool:
+    """Decode every slide into memory and let Pillow write the PDF in one go."""
     # Load all images
     images = []
     for i, img_path in enumerate(image_paths):
@@ -141,13 +257,7 @@ def combine_images_to_pdf(image_paths: List[Path], output_path: Path,
         )
         
         if verbose:
-            print(f"\n✓ PDF created: {output_path}")
-            print(f"  Total slides: {len(images)}")
-            file_size = output_path.stat().st_size
-            if file_size > 1024 * 1024:
-                print(f"  File size: {file_size / (1024 * 1024):.1f} MB")
-            else:
-                print(f"  File size: {file_size / 1024:.1f} KB")
+            _print_summary(output_path, len(images))
         
         return True
     except Exception as e:
@@ -159,6 +269,32 @@ def combine_images_to_pdf(image_paths: List[Path], output_path: Path,
             img.close()
 
 
+def _combine_streaming(pages: List[Tuple[Path, float]], output_path: Path,
+                       verbose: bool) -> bool:
+    """Write the PDF page by page; only one slide is ever held in memory."""
+    pdf = StreamingPDFWriter(output_path)
+    try:
+        pdf.open()
+        for i, (img_path, dpi) in enumerate(pages):
+            try:
+                width, height = pdf.add_image_page(img_path, dpi=dpi)
+            except Exception as e:
+                print(f"Error loading {img_path}: {e}")
+                pdf.abort()
+                return False
+            if verbose:
+                print(f"  [{i+1}/{len(pages)}] Added: {img_path.name} ({width}x{height})")
+        pdf.close()
+    except Exception as e:
+        print(f"Error creating PDF: {e}")
+        pdf.abort()
+        return False
+    
+    if verbose:
+        _print_summary(output_path, pdf.page_count)
+    return True
+
+
 def main():
     """Command-line interface."""
     parser = argparse.ArgumentParser(
@@ -194,6 +330,27 @@ Tips:
                        help="Output PDF file path")
     parser.add_argument("--dpi", type=int, default=150,
                        help="PDF resolution in DPI (default: 150)")
+    parser.add_argument("--writer", choices=["stream", "pillow"], default="stream",
+                       help="PDF writer: 'stream' writes one page at a time and embeds "
+                            "JPEG/PNG data without re-decoding (default); 'pillow' loads "
+                            "all slides into memory first")
+    parser.add_argument("--max-size", type=float, metavar="MB",
+                       help="Re-encode pages (JPEG quality/resolution per page) so the "
+                            "PDF fits within MB megabytes")
+    # Like normalize_images.add_normalize_arguments, declared here so the pptx skill
+    # is only needed when they are used. Only the options below --jobs normalize.
+    parser.add_argument("--jobs", type=int,
+                       help="Worker processes for normalizing and for the --max-size "
+                            "search (default: CPU count)")
+    parser.add_argument("--target-dpi", type=float,
+                       help="Downsample images to at most this DPI at their printed size")
+    parser.add_argument("--image-format", choices=["png", "jpeg"],
+                       help="Recompress normalized images as PNG (default) or JPEG")
+    parser.add_argument("--quality", type=int,
+                       help="JPEG quality for --image-format jpeg (default: 90)")
+    parser.add_argument("--scratch-dir",
+                       help="Directory for normalized images (default: a temporary "
+                            "directory); reused across runs")
     parser.add_argument("-v", "--verbose", action="store_true",
                        help="Verbose output")
     
@@ -214,13 +371,32 @@ Tips:
         for f in image_files:
             print(f"  - {f}")
     
+    # --jobs is shared with --max-size, so it does not ask for normalization by itself
+    normalize = None
+    explicit = {
+        "target_dpi": args.target_dpi,
+        "format": args.image_format,
+        "quality": args.quality,
+    }
+    explicit = {k: v for k, v in explicit.items() if v is not None}
+    if explicit or args.scratch_dir is not None:
+        normalize_images = _import_normalize_images()
+        if normalize_images is None:
+            sys.exit(1)
+        normalize = normalize_images.NormalizeOptions(**explicit)
+    
     # Combine into PDF
     output_path = Path(args.output)
     success = combine_images_to_pdf(
         image_files, 
         output_path, 
         dpi=args.dpi, 
-        verbose=args.verbose
+        verbose=args.verbose,
+        writer=args.writer,
+        normalize=normalize,
+        jobs=args.jobs,
+        scratch_dir=Path(args.scratch_dir) if args.scratch_dir else None,
+        max_size_mb=args.max_size
     )
     
     if success:
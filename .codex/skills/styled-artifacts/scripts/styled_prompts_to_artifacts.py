@@ -2,15 +2,25 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
+import hashlib
+import os
 import re
 import shutil
 import subprocess
 import sys
+import threading
 import urllib.parse
 import urllib.request
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional
+from typing import Awaitable, Callable, Optional, Union
+
+from generate_slide_image_ai import add_attachment_arguments, attachment_options_from_args
+from slide_cache import DEFAULT_MAX_MB, SlideImageCache, file_sha256
+from slide_manifest import SlideRecord, changed_slides, load_manifest, save_manifest
 
 
 _SLIDE_HEADER_RE = re.compile(r"^##\s+Slide\s+(\d+):\s+(.+?)\s*$", re.M)
@@ -200,6 +210,154 @@ def _pick_workdir(base: Path, *, reuse: bool) -> Path:
     raise RuntimeError(f"Could not find an available workdir version for: {base}")
 
 
+@dataclass(frozen=True)
+class SlideJob:
+    slide: ParsedSlide
+    prompt: str
+    attachments: list[Path]
+    out_path: Path
+    anchor: Optional[int] = None  # slide index whose image is attached as the style anchor
+    anchor_path: Optional[Path] = None
+
+
+_ANCHOR_POLICIES = ("previous", "first", "none")
+
+
+def _parse_anchor(value: str) -> Union[str, int]:
+    v = (value or "").strip().lower()
+    if v in _ANCHOR_POLICIES:
+        return v
+    i = int(v)
+    if i <= 0:
+        raise ValueError("slide numbers must be positive")
+    return i
+
+
+def _anchor_map(slides: list[ParsedSlide], policy: Union[str, int]) -> dict[int, Optional[int]]:
+    """
+    Decide which slide image is attached to each slide as its style anchor:
+      - "previous": the preceding slide (a serial chain; the historical behavior)
+      - "first":    the first slide of the deck, so every other slide can fan out
+      - "none":     no style anchor
+      - N:          a designated reference slide N (same fan-out shape as "first")
+    """
+    ordered = sorted(s.index for s in slides)
+    if not ordered or policy == "none":
+        return {i: None for i in ordered}
+    if policy == "previous":
+        return {i: (ordered[k - 1] if k > 0 else None) for k, i in enumerate(ordered)}
+
+    ref = ordered[0] if policy == "first" else int(policy)
+    if ref not in ordered:
+        raise ValueError(f"reference slide {ref} not found in prompts")
+    return {i: (ref if i != ref else None) for i in ordered}
+
+
+def _run_slide_jobs(
+    jobs: list[SlideJob],
+    generate: Callable[[SlideJob], None],
+    *,
+    max_workers: int = 1,
+) -> list[tuple[SlideJob, BaseException]]:
+    """
+    Run `generate` for every job on a bounded thread pool.
+
+    A job whose anchor slide is also being generated in this run waits for it to finish;
+    everything else starts immediately. After the first failure no new jobs are started
+    (already running ones finish). Returns the list of (job, error) failures.
+    """
+    in_run = {job.slide.index for job in jobs}
+    dependents: dict[int, list[SlideJob]] = {}
+    ready: list[SlideJob] = []
+    for job in jobs:
+        if job.anchor is not None and job.anchor in in_run:
+            dependents.setdefault(job.anchor, []).append(job)
+        else:
+            ready.append(job)
+
+    failures: list[tuple[SlideJob, BaseException]] = []
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        running: dict[Future[None], SlideJob] = {pool.submit(generate, job): job for job in ready}
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                job = running.pop(fut)
+                if fut.cancelled():
+                    continue
+                err = fut.exception()
+                if err is not None:
+                    failures.append((job, err))
+                    for other in running:
+                        other.cancel()
+                    continue
+                if failures:
+                    continue
+                for dep in dependents.pop(job.slide.index, []):
+                    running[pool.submit(generate, dep)] = dep
+    return failures
+
+
+async def _run_slide_jobs_async(
+    jobs: list[SlideJob],
+    generate: Callable[[SlideJob], Awaitable[None]],
+) -> list[tuple[SlideJob, BaseException]]:
+    """
+    Asyncio counterpart of `_run_slide_jobs`: one task per ready job (concurrency is bounded
+    by the async generator itself). Anchor dependencies are honored the same way; after the
+    first failure the remaining tasks are cancelled.
+    """
+    in_run = {job.slide.index for job in jobs}
+    dependents: dict[int, list[SlideJob]] = {}
+    ready: list[SlideJob] = []
+    for job in jobs:
+        if job.anchor is not None and job.anchor in in_run:
+            dependents.setdefault(job.anchor, []).append(job)
+        else:
+            ready.append(job)
+
+    failures: list[tuple[SlideJob, BaseException]] = []
+    running: dict[asyncio.Task[None], SlideJob] = {asyncio.create_task(generate(job)): job for job in ready}
+    while running:
+        done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            job = running.pop(task)
+            if task.cancelled():
+                continue
+            err = task.exception()
+            if err is not None:
+                failures.append((job, err))
+                for other in running:
+                    other.cancel()
+                continue
+            if failures:
+                continue
+            for dep in dependents.pop(job.slide.index, []):
+                running[asyncio.create_task(generate(dep))] = dep
+    return failures
+
+
+def _slide_record(
+    job: SlideJob,
+    workdir: Path,
+    *,
+    model: str,
+    attachment_options: str,
+    anchor_sha: Optional[str] = None,
+) -> SlideRecord:
+    return SlideRecord(
+        index=job.slide.index,
+        slug=_slug(job.slide.title),
+        prompt_sha256=hashlib.sha256(job.prompt.encode("utf-8")).hexdigest(),
+        attachments=[file_sha256(a) for a in job.attachments],
+        anchor=job.anchor,
+        anchor_sha256=anchor_sha,
+        model=model,
+        attachment_options=attachment_options,
+        output=str(job.out_path.relative_to(workdir)),
+        generated_at=datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    )
+
+
 def main(argv: Optional[list[str]] = None) -> int:
     p = argparse.ArgumentParser(description="Generate slide images + PDF/PPTX from v2 styled prompts")
     p.add_argument("--prompts", required=True, help="Path to prompts/styled/*.md")
@@ -207,10 +365,29 @@ def main(argv: Optional[list[str]] = None) -> int:
     p.add_argument("--pdf", help="Optional PDF output path")
     p.add_argument("--pptx", help="Optional PPTX output path")
     p.add_argument("--only", help="Only generate a subset of slides (e.g. '3' or '2,5,8' or '5-8')")
+    p.add_argument("--changed", action="store_true", help="Only regenerate slides whose inputs changed since the last run (per workdir manifest)")
     p.add_argument("--reuse-workdir", action="store_true", help="Reuse workdir if it exists (default is to create workdir-N)")
     p.add_argument("--allow-empty-global-context", action="store_true", help="Allow styled prompts with no deck-level global context")
     p.add_argument("--api-key", help="OpenRouter API key (or set OPENROUTER_API_KEY / .OPENROUTER_API_KEY)")
     p.add_argument("--no-download", action="store_true", help="Disable downloading http(s) image URLs")
+    p.add_argument("--max-retries", type=int, default=4, help="Retries per slide on 429/5xx/connection errors (default: 4)")
+    add_attachment_arguments(p)
+    p.add_argument("--jobs", type=int, default=1, help="Number of slides to generate concurrently (default: 1)")
+    p.add_argument("--async", dest="use_async", action="store_true", help="Use the asyncio client (needs aiohttp) instead of worker threads")
+    p.add_argument("--rpm", type=float, help="With --async: limit API requests per minute")
+    p.add_argument(
+        "--assemble-jobs",
+        type=int,
+        help="Normalize slide images for PDF/PPTX in N processes, into workdir/normalized/ (shared by both exporters)",
+    )
+    p.add_argument("--cache-dir", help="Slide image cache directory (default: <workdir parent>/.cache)")
+    p.add_argument("--cache-max-mb", type=int, default=DEFAULT_MAX_MB, help=f"Slide image cache size limit in MB (default: {DEFAULT_MAX_MB})")
+    p.add_argument("--no-cache", action="store_true", help="Always call the image model (do not read or write the slide cache)")
+    p.add_argument(
+        "--anchor",
+        default="previous",
+        help="Style anchor attached to each slide: 'previous' (default; serial), 'first', 'none', or a slide number",
+    )
     args = p.parse_args(argv)
 
     prompts_path = Path(args.prompts)
@@ -218,6 +395,19 @@ def main(argv: Optional[list[str]] = None) -> int:
         print(f"Prompts file not found: {prompts_path}", file=sys.stderr)
         return 2
 
+    if args.jobs < 1:
+        print("--jobs must be >= 1", file=sys.stderr)
+        return 2
+    try:
+        args.anchor = _parse_anchor(args.anchor)
+    except ValueError as e:
+        print(f"Invalid --anchor value: {e}", file=sys.stderr)
+        return 2
+
+    if args.only and args.changed:
+        print("--only and --changed are mutually exclusive", file=sys.stderr)
+        return 2
+
     base_workdir = Path(args.workdir)
     selected: Optional[set[int]] = None
     if args.only:
@@ -229,7 +419,7 @@ def main(argv: Optional[list[str]] = None) -> int:
 
     # Default: avoid clobbering previous work. If the user is doing an incremental regeneration,
     # they'll typically want to reuse the same workdir.
-    reuse_workdir = bool(args.reuse_workdir) or bool(selected)
+    reuse_workdir = bool(args.reuse_workdir) or bool(selected) or bool(args.changed)
     workdir = _pick_workdir(base_workdir, reuse=reuse_workdir)
     if workdir != base_workdir:
         print(f"Workdir exists; writing into: {workdir}")
@@ -280,26 +470,29 @@ def main(argv: Optional[list[str]] = None) -> int:
 
     slides = sorted(slides, key=lambda s: s.index)
 
-    gen_script = Path(__file__).resolve().parent / "generate_slide_image_ai.py"
-    if not gen_script.exists():
-        print(f"Missing generator script: {gen_script}", file=sys.stderr)
+    try:
+        anchors = _anchor_map(slides, args.anchor)
+    except ValueError as e:
+        print(f"Invalid --anchor value: {e}", file=sys.stderr)
         return 2
 
-    previous_slide: Optional[Path] = None
     slide_images: list[Path] = []
+    out_paths = {s.index: slides_dir / f"{s.index:02d}_{_slug(s.title)}.png" for s in slides}
 
     needs_slide_images = bool(args.pdf) or bool(args.pptx)
 
     if needs_slide_images:
+        api_key = args.api_key or os.getenv("OPENROUTER_API_KEY")
+        if not api_key:
+            print("Error: OPENROUTER_API_KEY environment variable not set.", file=sys.stderr)
+            return 2
+
+        jobs: list[SlideJob] = []
         for slide in slides:
             if selected is not None and slide.index not in selected:
                 continue
-            prompt = _build_slide_prompt(slide, global_context)
 
             attachments: list[Path] = []
-            if previous_slide and previous_slide.exists():
-                attachments.append(previous_slide)
-
             for alt, src in slide.images:
                 resolved = _resolve_attachment(
                     repo_root,
@@ -313,65 +506,172 @@ def main(argv: Optional[list[str]] = None) -> int:
                     continue
                 attachments.append(_normalize_attachment(resolved, raster_dir=raster_dir))
 
-            out_name = f"{slide.index:02d}_{_slug(slide.title)}.png"
-            out_path = slides_dir / out_name
+            anchor = anchors.get(slide.index)
+            jobs.append(
+                SlideJob(
+                    slide=slide,
+                    prompt=_build_slide_prompt(slide, global_context),
+                    attachments=attachments,
+                    out_path=out_paths[slide.index],
+                    anchor=anchor,
+                    anchor_path=out_paths[anchor] if anchor is not None else None,
+                )
+            )
 
-            cmd = [sys.executable, str(gen_script), prompt, "-o", str(out_path)]
-            if args.api_key:
-                cmd.extend(["--api-key", args.api_key])
-            for a in attachments:
-                cmd.extend(["--attach", str(a)])
+        from generate_slide_image_ai import AsyncSlideImageGenerator, SlideImageGenerator
 
-            print("\n" + "=" * 60)
-            print("Generating Slide Image")
-            print("=" * 60)
-            print(f"Slide title: {slide.title}")
+        attachment_options = attachment_options_from_args(args)
+        generator: Union[SlideImageGenerator, AsyncSlideImageGenerator]
+        if args.use_async:
+            try:
+                generator = AsyncSlideImageGenerator(
+                    api_key=api_key,
+                    max_retries=args.max_retries,
+                    max_concurrency=args.jobs,
+                    requests_per_minute=args.rpm,
+                    attachment_options=attachment_options,
+                )
+            except RuntimeError as e:
+                print(f"Error: {e}", file=sys.stderr)
+                return 2
+        else:
+            generator = SlideImageGenerator(
+                api_key=api_key,
+                max_retries=args.max_retries,
+                pool_size=args.jobs,
+                attachment_options=attachment_options,
+            )
+        # Recorded per slide, so --changed agrees with the slide cache key on what is an unchanged input
+        record_inputs = {"model": generator.image_model, "attachment_options": repr(attachment_options)}
+        manifest = load_manifest(workdir)
+        if args.changed:
+            current = {job.slide.index: _slide_record(job, workdir, **record_inputs) for job in jobs}
+            dirty = changed_slides(current, manifest, workdir)
+            jobs = [job for job in jobs if job.slide.index in dirty]
+            print(f"Changed slide(s): {sorted(dirty) if dirty else 'none'}")
+
+        print_lock = threading.Lock()
+        generated: dict[int, SlideRecord] = {}
+
+        cache: Optional[SlideImageCache] = None
+        if not args.no_cache:
+            # Keyed off the requested workdir (not the versioned work-N) so reruns share it.
+            cache_dir = Path(args.cache_dir) if args.cache_dir else base_workdir.parent / ".cache"
+            cache = SlideImageCache(cache_dir, max_bytes=args.cache_max_mb * 1024 * 1024)
+
+        def prepare(job: SlideJob) -> Optional[tuple[list[Path], Optional[str], Optional[str]]]:
+            """Return (attachments, anchor hash, cache key) for `job`, or None if it was served from the cache."""
+            attachments = list(job.attachments)
+            anchor_sha: Optional[str] = None
+            if job.anchor_path is not None and job.anchor_path.exists():
+                attachments.insert(0, job.anchor_path)
+                anchor_sha = file_sha256(job.anchor_path)
+
+            key = cache.key(job.prompt, generator.image_model, attachments, extra=repr(attachment_options)) if cache else None
+            if cache and key:
+                hit = cache.get(key)
+                if hit is not None:
+                    shutil.copyfile(hit, job.out_path)
+                    with print_lock:
+                        generated[job.slide.index] = _slide_record(job, workdir, anchor_sha=anchor_sha, **record_inputs)
+                        print(f"✓ Slide {job.slide.index}: {job.out_path.name} (cached)", flush=True)
+                    return None
+
+            lines = ["", "=" * 60, "Generating Slide Image", "=" * 60, f"Slide title: {job.slide.title}"]
             if attachments:
-                print(f"Attachments: {len(attachments)} file(s)")
-                for a in attachments:
-                    print(f"  - {a}")
-            print(f"Output: {out_path}")
-            print("=" * 60 + "\n")
-
-            proc = subprocess.run(cmd)
-            if proc.returncode != 0:
-                print("✗ Generation failed.", file=sys.stderr)
-                return int(proc.returncode)
-
-            slide_images.append(out_path)
-            previous_slide = out_path
-
-        if selected is None:
+                lines.append(f"Attachments: {len(attachments)} file(s)")
+                lines.extend(f"  - {a}" for a in attachments)
+            lines.extend([f"Output: {job.out_path}", "=" * 60, ""])
+            with print_lock:
+                print("\n".join(lines), flush=True)
+            return attachments, anchor_sha, key
+
+        def finish(job: SlideJob, anchor_sha: Optional[str], key: Optional[str]) -> None:
+            if cache and key:
+                cache.put_file(key, job.out_path)
+
+            with print_lock:
+                generated[job.slide.index] = _slide_record(job, workdir, anchor_sha=anchor_sha, **record_inputs)
+                print(f"✓ Slide {job.slide.index}: {job.out_path.name}", flush=True)
+
+        if isinstance(generator, AsyncSlideImageGenerator):
+            agen = generator
+
+            async def agenerate(job: SlideJob) -> None:
+                prepared = prepare(job)
+                if prepared is not None:
+                    attachments, anchor_sha, key = prepared
+                    await agen.generate_to_file(prompt=job.prompt, attachments=attachments, output=job.out_path)
+                    finish(job, anchor_sha, key)
+
+            async def run_async() -> list[tuple[SlideJob, BaseException]]:
+                async with agen:
+                    return await _run_slide_jobs_async(jobs, agenerate)
+
+            failures = asyncio.run(run_async())
+        else:
+            sgen = generator
+
+            def generate(job: SlideJob) -> None:
+                prepared = prepare(job)
+                if prepared is not None:
+                    attachments, anchor_sha, key = prepared
+                    sgen.generate_to_file(prompt=job.prompt, attachments=attachments, output=job.out_path)
+                    finish(job, anchor_sha, key)
+
+            failures = _run_slide_jobs(jobs, generate, max_workers=args.jobs)
+            sgen.close()
+        if generator.request_stats:
+            retried = sum(st.attempts - 1 for st in generator.request_stats)
+            latency = sum(st.latency_s for st in generator.request_stats) / len(generator.request_stats)
+            print(f"API requests: {len(generator.request_stats)} ({retried} retries, avg {latency:.1f}s)")
+        if cache:
+            cache.evict()
+        # Record successes even when other slides failed, so a rerun with --changed resumes.
+        manifest.update(generated)
+        save_manifest(workdir, {i: r for i, r in manifest.items() if i in out_paths})
+        if failures:
+            for job, err in failures:
+                print(f"✗ Generation failed for slide {job.slide.index}: {err}", file=sys.stderr)
+            return 1
+        slide_images = [job.out_path for job in jobs]
+
+        if args.changed:
+            print(f"Generated {len(slide_images)} slide image(s) for --changed")
+        elif selected is None:
             print(f"Generated {len(slide_images)} slide image(s)")
         else:
             print(f"Generated {len(slide_images)} slide image(s) for --only={args.only}")
 
     requires_full_deck_images = bool(args.pdf) or bool(args.pptx)
-    if requires_full_deck_images and selected is not None:
-        missing: list[int] = []
-        for slide in slides:
-            expected = slides_dir / f"{slide.index:02d}_{_slug(slide.title)}.png"
-            if not expected.exists():
-                missing.append(slide.index)
+    if requires_full_deck_images and (selected is not None or args.changed):
+        missing = [i for i, path in out_paths.items() if not path.exists()]
         if missing:
             print(
                 "Cannot assemble full PDF/PPTX because some slide images are missing in the workdir.\n"
                 f"Missing slide(s): {missing}\n"
-                "Tip: rerun without --only, or rerun with --reuse-workdir and keep prior slides in the same workdir.",
+                "Tip: rerun without --only/--changed, or rerun with --reuse-workdir and keep prior slides in the same workdir.",
                 file=sys.stderr,
             )
             return 2
 
+    # Assemble from the current deck's slide images only (not a glob of slides/), so images
+    # left behind by renamed or deleted slides never end up in the PDF/PPTX.
+    deck_images = [str(out_paths[s.index]) for s in slides]
+    assemble_args: list[str] = []
+    if args.assemble_jobs:
+        assemble_args = ["--jobs", str(args.assemble_jobs), "--scratch-dir", str(workdir / "normalized")]
+
     if args.pdf:
         pdf_script = Path(__file__).resolve().parent / "slides_to_pdf.py"
-        subprocess.run([sys.executable, str(pdf_script), str(slides_dir), "-o", str(Path(args.pdf))], check=True)
+        subprocess.run([sys.executable, str(pdf_script), *deck_images, "-o", str(Path(args.pdf)), *assemble_args], check=True)
 
     if args.pptx:
         ppt_script = repo_root / ".codex" / "skills" / "pptx" / "scripts" / "images_to_pptx.py"
         if not ppt_script.exists():
             print(f"Missing PPTX builder from pptx skill: {ppt_script}", file=sys.stderr)
             return 2
-        subprocess.run([sys.executable, str(ppt_script), str(slides_dir), "-o", str(Path(args.pptx))], check=True)
+        subprocess.run([sys.executable, str(ppt_script), *deck_images, "-o", str(Path(args.pptx)), *assemble_args], check=True)
 
     return 0
 